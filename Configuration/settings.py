@@ -26,6 +26,26 @@ class AppConfig:
     
     # Data settings
     DATA_FILENAME = "journal.json"
+    STORAGE_BACKEND = "json"     # "json" or "sqlite"
+    SQLITE_EXTENSION = ".db"     # SQLite journal lives next to the JSON file
+    COLUMNAR_STORE = False       # Keep NumPy columns for vectorized filters (needs numpy)
+    COLUMNAR_MIN_CAPACITY = 1024 # Initial rows allocated per column
+    DATE_KEY_CACHE_SIZE = 100000 # Distinct dates whose parsed keys are kept in memory
+    APPEND_ONLY_LOG = True       # Append adds/deletes to a JSON Lines log
+    LOG_EXTENSION = ".jsonl"     # Log lives next to the snapshot file
+    LOG_COMPACT_THRESHOLD = 500  # Rewrite the snapshot after this many log records
+    SAVE_DEBOUNCE_MS = 500       # Window over which log syncs and snapshot rewrites are coalesced
+    BACKUP_DIR_SUFFIX = "_backups"   # Incremental backups live in e.g. journal_backups/
+    BACKUP_MAX_DELTAS = 50           # Deltas after a base before the next backup is a fresh base
+    BACKUP_COMPRESS_LEVEL = 6        # Gzip level for backup files
+    JOURNAL_COMPRESSION = None       # None, "gzip" or "lzma"; detected automatically when loading
+    JOURNAL_COMPRESS_LEVEL = 6       # Gzip level for compressed journals
+    JOURNAL_LZMA_PRESET = 1          # Low presets keep lzma saves fast on big journals
+    LOAD_CHUNK_BYTES = 1024 * 1024   # Bytes read and parsed per step when loading the journal
+    LOAD_USE_MMAP = True             # Read the journal through a memory map
+    LOAD_PROGRESSIVE = True          # Show the newest entries while older history loads in the background
+    LOAD_PROGRESSIVE_MIN_BYTES = 4 * 1024 * 1024  # Smaller journals are loaded in one go
+    LOAD_RECENT_ENTRIES = 2000       # Entries loaded before the window opens
     
     # Default moods
     DEFAULT_MOODS = [
@@ -36,15 +56,53 @@ class AppConfig:
     # UI settings
     DATE_FORMAT = "%Y-%m-%d"
     NOTES_PREVIEW_LENGTH = 50
+    ENTRIES_PAGE_SIZE = 200          # Treeview rows materialized per page
+    ENTRIES_FETCH_THRESHOLD = 0.9    # Scroll fraction that triggers the next page
+    ENTRIES_MAX_ROWS = 2000          # Treeview rows kept at once; pages scrolled well past are released
     
     # Layout settings
     PADDING_X = 15  # Increased for better breathing room
     PADDING_Y = 15
     INNER_PADDING = 8
     
+    # Startup settings
+    STARTUP_BUDGET_MS = 1500                       # Process start to first paint
+    STARTUP_REPORT_FILENAME = "startup_timing.json"  # Empty to skip writing the report
+    
+    # Instrumentation settings
+    INSTRUMENTATION_ENABLED = False       # Record hot-path timings (also toggled from the Settings tab)
+    INSTRUMENTATION_TRACE_MEMORY = True   # Count allocations with tracemalloc while recording (slower)
+    INSTRUMENTATION_BUFFER_SIZE = 1000    # Most recent operations kept in memory
+    INSTRUMENTATION_DUMP_FILENAME = "instrumentation.json"
+    PROFILE_OUTPUT_DIR = "profiles"       # cProfile captures are written here as .prof files
+    PROFILE_TOP_FUNCTIONS = 30            # Functions listed in a capture's text summary
+    
+    # Background task settings
+    TASK_WORKERS = 1               # A single worker keeps journal writes ordered
+    TASK_POLL_INTERVAL_MS = 50     # How often the Tk thread drains worker events
+    TASK_PROGRESS_EVERY = 1000     # Rows between progress updates / cancel checks
+    
+    # Export settings
+    EXPORT_BUFFER_SIZE = 1024 * 1024  # Bytes buffered before each write to the export file
+    EXPORT_COMPRESS = False           # Name exports given without an extension .csv.gz (gzipped)
+    EXPORT_COMPRESS_LEVEL = 6
+    EXPORT_PAGE_SIZE = 5000           # Entries read per hold of the data lock while exporting
+    
+    # Import settings
+    IMPORT_BATCH_SIZE = 5000   # Rows validated per batch between progress updates
+    IMPORT_MAX_ERRORS = 100    # Bad rows listed individually in the import summary
+    
     # Report settings
     CHART_FIGSIZE = (9, 5)   # Slightly larger
     TIMELINE_FIGSIZE = (12, 5)
+    TIMELINE_MAX_DATE_TICKS = 30   # Dates labelled on the timeline x axis
 
     # ML Settings
-    NEUTRAL_SENTIMENT = 0.0
\ No newline at end of file
+    NEUTRAL_SENTIMENT = 0.0
+    SENTIMENT_WORKERS = None       # Process pool size for batch scoring (None = CPU count)
+    SENTIMENT_CHUNK_SIZE = 64      # Notes sent to a worker per task
+    SENTIMENT_CACHE_ENABLED = True
+    SENTIMENT_CACHE_FILENAME = "sentiment_cache.db"
+    SENTIMENT_CACHE_MAX_ENTRIES = 100000
+    SENTIMENT_CACHE_COMMIT_EVERY = 100  # Cache writes batched per commit
+    SENTIMENT_CACHE_COMMIT_INTERVAL_S = 5.0  # ...or once the oldest uncommitted write is this old
\ No newline at end of file
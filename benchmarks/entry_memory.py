@@ -0,0 +1,51 @@
+"""
+Memory benchmark: bytes per journal entry as plain dicts vs slotted Entry objects
+
+Run from the project root:  python -m benchmarks.entry_memory [count]
+"""
+import gc
+import json
+import random
+import sys
+import tracemalloc
+from datetime import date, timedelta
+from Configuration.settings import AppConfig
+from modules.entry import Entry
+
+def make_lines(count, seed=0):
+    """Serialized entries as they appear in a journal snapshot, one JSON object per line"""
+    rng = random.Random(seed)
+    start = date(2015, 1, 1)
+    lines = []
+    for i in range(count):
+        entry = {
+            "date": (start + timedelta(days=i // 3)).isoformat(),
+            "mood": rng.choice(AppConfig.DEFAULT_MOODS),
+            "notes": " ".join(rng.choice(["slept", "well", "busy", "day", "walk", "coffee"]) for _ in range(6)),
+            "id": f"{rng.getrandbits(128):032x}",
+        }
+        lines.append(json.dumps(entry))
+    return lines
+
+def measure(lines, convert):
+    """Bytes allocated per entry while holding every parsed entry in memory"""
+    gc.collect()
+    tracemalloc.start()
+    entries = [convert(json.loads(line)) for line in lines]
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del entries
+    return current / len(lines)
+
+def main(count=100000):
+    """Print bytes per entry before and after the Entry conversion"""
+    lines = make_lines(count)
+    as_dicts = measure(lines, lambda data: data)
+    as_entries = measure(lines, Entry.from_dict)
+    print(f"{count} entries")
+    print(f"  dict entries:  {as_dicts:8.1f} bytes/entry")
+    print(f"  Entry objects: {as_entries:8.1f} bytes/entry")
+    print(f"  saving:        {100 * (1 - as_entries / as_dicts):8.1f}%")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
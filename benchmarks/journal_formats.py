@@ -0,0 +1,86 @@
+"""
+Size, save and load time of the journal snapshot formats
+
+Run from the project root:
+    python -m benchmarks.journal_formats --sizes 10000 100000 --output formats.json
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import tempfile
+import time
+from Configuration.settings import AppConfig
+from modules.entry import Entry
+from modules.storage import JsonFileStorage, write_atomic, write_json_atomic, write_snapshot
+from benchmarks.synthetic_journal import generate_entries
+
+def write_spaced_lines(filename, entries):
+    """The earlier line layout, written with json's default ", " / ": " separators"""
+    def write(file):
+        file.write("[\n" + ",\n".join(json.dumps(entry, default=Entry.to_dict) for entry in entries) + "\n]\n")
+    write_atomic(filename, write)
+
+# name -> function writing entries to a filename
+FORMATS = {
+    "pretty (indent=4)": lambda filename, entries: write_json_atomic(filename, entries, indent=4),
+    "lines": write_spaced_lines,
+    "compact lines": lambda filename, entries: write_snapshot(filename, entries),
+    "compact lines + gzip": lambda filename, entries: write_snapshot(filename, entries, 'gzip'),
+    "compact lines + lzma": lambda filename, entries: write_snapshot(filename, entries, 'lzma'),
+}
+
+def median_time(func, repeat):
+    """Median seconds over repeat runs of func"""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+def bench_format(write, filename, entries, repeat):
+    """Save, measure and load one format"""
+    save_s = median_time(lambda: write(filename, entries), repeat)
+    storage = JsonFileStorage(filename, append_only=False)
+    load_s = median_time(storage.load, repeat)
+    assert len(storage.load()) == len(entries)
+    return {'bytes': os.path.getsize(filename), 'save_s': save_s, 'load_s': load_s}
+
+def main():
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Compare journal snapshot formats")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="journal_formats.json")
+    args = parser.parse_args()
+
+    results = []
+    workdir = tempfile.mkdtemp(prefix="journal_formats_")
+    try:
+        for size in args.sizes:
+            entries = [Entry.from_dict(entry) for entry in generate_entries(size, args.seed)]
+            print(f"{size} entries")
+            print(f"  {'format':<22} {'size MB':>9} {'vs pretty':>9} {'save s':>8} {'load s':>8}")
+            baseline = None
+            for name, write in FORMATS.items():
+                filename = os.path.join(workdir, "journal.json")
+                stats = bench_format(write, filename, entries, args.repeat)
+                baseline = baseline or stats['bytes']
+                results.append(dict(stats, size=size, format=name))
+                print(f"  {name:<22} {stats['bytes'] / 1e6:>9.2f} {stats['bytes'] / baseline:>9.0%} "
+                      f"{stats['save_s']:>8.3f} {stats['load_s']:>8.3f}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    with open(args.output, 'w') as file:
+        json.dump({'settings': {'gzip_level': AppConfig.JOURNAL_COMPRESS_LEVEL,
+                                'lzma_preset': AppConfig.JOURNAL_LZMA_PRESET,
+                                'repeat': args.repeat, 'seed': args.seed},
+                   'results': results}, file, indent=4)
+    print(f"Results written to {args.output}")
+
+if __name__ == "__main__":
+    main()
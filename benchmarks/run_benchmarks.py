@@ -0,0 +1,173 @@
+"""
+Benchmark suite for the data and report paths on synthetic journals
+
+Run from the project root, e.g.:
+    python -m benchmarks.run_benchmarks --sizes 1000 100000 --output bench.json
+
+Every size gets a fresh synthetic journal in a temporary directory. Results
+are written as JSON so runs on different commits can be compared.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import tempfile
+import time
+from datetime import datetime
+from Configuration.settings import AppConfig
+from modules.data_manager import DataManager
+from modules.entry import Entry
+from utils.report_generator import ReportGenerator
+from benchmarks.synthetic_journal import MOOD_WEIGHTS, write_journal
+
+DEFAULT_SIZES = [1000, 10000, 100000, 1000000]
+
+# Filters for get_entries: every combination of date range, mood and notes text
+FILTER_CASES = {
+    "none": {},
+    "date": {'start_date': "2001-01-01", 'end_date': "2001-12-31"},
+    "mood": {'mood': "Calm"},
+    "date+mood": {'start_date': "2001-01-01", 'end_date': "2001-12-31", 'mood': "Calm"},
+    "text": {'text': "coffee"},
+    "text+date": {'text': "coffee", 'start_date': "2001-01-01", 'end_date': "2001-12-31"},
+    "text+mood": {'text': "coffee", 'mood': "Calm"},
+    "text+date+mood": {'text': "coffee", 'start_date': "2001-01-01", 'end_date': "2001-12-31", 'mood': "Calm"},
+    "prefix": {'text': "head*"},
+}
+
+def time_call(func, repeat):
+    """Run func repeat times, returning timing stats in seconds"""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return {'min': min(times), 'median': statistics.median(times), 'runs': repeat}
+
+def time_ops(func, count):
+    """Time count calls of func(i) as one batch, returning total and per-op seconds"""
+    start = time.perf_counter()
+    for i in range(count):
+        func(i)
+    total = time.perf_counter() - start
+    return {'total': total, 'per_op': total / count if count else 0.0, 'ops': count}
+
+def git_commit():
+    """Current commit hash, or None outside a git checkout"""
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def bench_size(size, args, workdir):
+    """Run every benchmark against one synthetic journal size"""
+    filename = os.path.join(workdir, f"journal_{size}.json")
+    results = {}
+
+    start = time.perf_counter()
+    write_journal(filename, size, args.seed)
+    results['generate'] = {'total': time.perf_counter() - start}
+
+    # Full load, as the app does for journals below the progressive threshold
+    AppConfig.LOAD_PROGRESSIVE = False
+    data_manager = DataManager(filename, backend=args.backend)
+    results['load_data'] = time_call(data_manager.load_data, args.repeat)
+
+    # First-paint load of a big journal: newest entries only, history deferred
+    AppConfig.LOAD_PROGRESSIVE = True
+    AppConfig.LOAD_PROGRESSIVE_MIN_BYTES = 0
+    results['load_data_progressive'] = time_call(data_manager.load_data, args.repeat)
+    if data_manager.history_pending:
+        results['load_history'] = time_call(
+            lambda: data_manager.merge_history(data_manager.load_history()), 1)
+    AppConfig.LOAD_PROGRESSIVE = False
+
+    rng = random.Random(args.seed)
+    moods = list(MOOD_WEIGHTS)
+    ops = min(args.ops, size)
+
+    def add(i):
+        data_manager.add_entry(Entry("2001-06-15", rng.choice(moods), f"benchmark entry {i}"))
+    results['add_entry'] = time_ops(add, ops)
+    results['add_entry_flush'] = time_call(data_manager.flush_data, 1)
+
+    def delete(i):
+        data_manager.delete_entry(rng.randrange(len(data_manager.data)))
+    results['delete_entry'] = time_ops(delete, ops)
+    results['delete_entry_flush'] = time_call(data_manager.flush_data, 1)
+
+    results['get_entries'] = {}
+    for name, filters in FILTER_CASES.items():
+        # The first text query builds the notes index; time that separately
+        if name == "text":
+            data_manager.text_index.invalidate()
+            results['text_index_build'] = time_call(lambda: data_manager.get_entries(filters), 1)
+        stats = time_call(lambda: data_manager.get_entries(filters), args.repeat)
+        stats['matches'] = len(data_manager.get_entries(filters))
+        results['get_entries'][name] = stats
+
+    report_generator = ReportGenerator(data_manager)
+    results['reports'] = {
+        'weekly_text': time_call(report_generator.generate_weekly_report_text, args.repeat),
+        'monthly_text': time_call(report_generator.generate_monthly_report_text, args.repeat),
+        'summary_data': time_call(report_generator.get_mood_counts, args.repeat),
+        'timeline_data': time_call(report_generator.get_timeline_data, args.repeat),
+    }
+    if size <= args.max_chart_size:
+        for report_type in ("summary", "timeline"):
+            results['reports'][f"{report_type}_chart"] = time_call(
+                lambda: report_generator.render_chart(report_type), args.repeat)
+
+    data_manager.close()
+    return results
+
+def main():
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Benchmark the journal data and report paths")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES,
+                        help="journal sizes to test (1k to 10M)")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per timed call")
+    parser.add_argument("--ops", type=int, default=1000, help="adds and deletes per size")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--backend", choices=("json", "sqlite"), default=AppConfig.STORAGE_BACKEND)
+    parser.add_argument("--columnar", action="store_true", help="enable the NumPy column store")
+    parser.add_argument("--max-chart-size", type=int, default=1000000,
+                        help="skip chart rendering above this many entries")
+    parser.add_argument("--output", default="benchmark_results.json")
+    args = parser.parse_args()
+
+    AppConfig.COLUMNAR_STORE = args.columnar
+    # The timeline chart renders through matplotlib's headless Agg backend
+    import matplotlib
+    matplotlib.use("Agg")
+
+    report = {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'settings': {'backend': args.backend, 'columnar': args.columnar, 'seed': args.seed,
+                     'repeat': args.repeat, 'ops': args.ops,
+                     'append_only_log': AppConfig.APPEND_ONLY_LOG},
+        'results': [],
+    }
+
+    workdir = tempfile.mkdtemp(prefix="journal_bench_")
+    try:
+        for size in args.sizes:
+            print(f"Benchmarking {size} entries...")
+            report['results'].append({'size': size, 'benchmarks': bench_size(size, args, workdir)})
+            # Write after every size so a long run still leaves partial results
+            with open(args.output, 'w') as file:
+                json.dump(report, file, indent=4)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    print(f"Results written to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Seeded generator for synthetic journals of realistic shape
+
+Run from the project root:  python -m benchmarks.synthetic_journal COUNT FILENAME [--seed N]
+"""
+import argparse
+import math
+import random
+from datetime import date, timedelta
+from modules.storage import write_atomic, write_snapshot_lines
+
+# Relative frequency of each mood; mostly everyday moods, fewer strong ones
+MOOD_WEIGHTS = {
+    "Happy": 20, "Neutral": 18, "Calm": 14, "Tired": 12, "Stressed": 10,
+    "Energetic": 8, "Excited": 7, "Anxious": 6, "Sad": 5,
+}
+
+NOTE_WORDS = (
+    "slept well badly work meeting deadline walk run gym coffee tea friends family "
+    "dinner lunch rain sunny cold tired focused busy quiet weekend call read book "
+    "movie music project finished started headache relaxed worried proud grateful"
+).split()
+
+EMPTY_NOTE_RATE = 0.15   # Share of entries written without notes
+NOTE_WORDS_MEDIAN = 12   # Log-normal word count for the rest
+NOTE_WORDS_SIGMA = 0.8
+ENTRIES_PER_DAY = 1.4    # Average entries per day, so dates repeat
+
+def generate_entries(count, seed=0, start=date(2000, 1, 1)):
+    """Yield count synthetic entry dicts in date order, reproducibly for a seed"""
+    rng = random.Random(seed)
+    moods = list(MOOD_WEIGHTS)
+    weights = list(MOOD_WEIGHTS.values())
+    day = start
+    for _ in range(count):
+        if rng.random() < 1 / ENTRIES_PER_DAY:
+            day += timedelta(days=1)
+
+        if rng.random() < EMPTY_NOTE_RATE:
+            notes = ""
+        else:
+            words = max(1, int(rng.lognormvariate(math.log(NOTE_WORDS_MEDIAN), NOTE_WORDS_SIGMA)))
+            notes = " ".join(rng.choices(NOTE_WORDS, k=words)).capitalize() + "."
+
+        yield {
+            "date": day.isoformat(),
+            "mood": rng.choices(moods, weights)[0],
+            "notes": notes,
+            "id": f"{rng.getrandbits(128):032x}",
+        }
+
+def write_journal(filename, count, seed=0):
+    """Write a synthetic journal snapshot without holding it in memory"""
+    write_atomic(filename, lambda file: write_snapshot_lines(file, generate_entries(count, seed)))
+
+def main():
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Write a synthetic mood journal")
+    parser.add_argument("count", type=int, help="number of entries")
+    parser.add_argument("filename", help="journal file to write")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    write_journal(args.filename, args.count, args.seed)
+
+if __name__ == "__main__":
+    main()
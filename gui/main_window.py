@@ -2,11 +2,12 @@
 Main application window
 """
 import tkinter as tk
-from tkinter import ttk
+from tkinter import ttk, messagebox
 from Configuration.settings import AppConfig
 from modules.data_manager import DataManager
 from utils.report_generator import ReportGenerator
 from gui.tabs import AddEntryTab, ViewEntriesTab, ReportsTab, SettingsTab
+from gui.task_runner import TaskRunner
 
 class MoodJournalApp:
     """Main application class"""
@@ -17,7 +18,8 @@ class MoodJournalApp:
         self.setup_style() # Call new style setup method
         
         # Initialize components
-        self.data_manager = DataManager(AppConfig.DATA_FILENAME)
+        self.task_runner = None
+        self.data_manager = DataManager(AppConfig.DATA_FILENAME, error_handler=self.show_data_error)
         self.report_generator = ReportGenerator(self.data_manager)
         self.moods = AppConfig.DEFAULT_MOODS.copy()
         
@@ -26,6 +28,28 @@ class MoodJournalApp:
         
         # Load initial data
         self.refresh_ui()
+        
+        # Big journals open with their newest entries; the rest streams in behind the window
+        if self.data_manager.history_pending:
+            self.task_runner.submit(
+                "Loading older entries", lambda task: self.data_manager.load_history(),
+                on_success=self.data_manager.merge_history
+            )
+        
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+    
+    def show_data_error(self, title, message, warning=False):
+        """DataManager error handler that reports through message boxes
+        
+        Entries are saved on the background worker, so the dialog is handed
+        to the Tk thread rather than shown from there.
+        """
+        show = messagebox.showwarning if warning else messagebox.showerror
+        if self.task_runner is None:
+            # Still starting up on the Tk thread
+            show(title, message)
+        else:
+            self.task_runner.call_in_ui(show, title, message)
     
     def setup_window(self):
         """Setup the main window"""
@@ -95,10 +119,15 @@ class MoodJournalApp:
         # Status bar
         self.status_var = tk.StringVar()
         self.status_var.set("Ready")
-        status_bar = tk.Label(self.root, textvariable=self.status_var, relief=tk.SUNKEN, anchor=tk.W,
+        self.task_runner = TaskRunner(self.root, self.status_var)
+        
+        status_frame = tk.Frame(self.root, bg=AppConfig.BACKGROUND_COLOR)
+        status_frame.pack(side=tk.BOTTOM, fill=tk.X)
+        status_bar = tk.Label(status_frame, textvariable=self.status_var, relief=tk.SUNKEN, anchor=tk.W,
                               bg=AppConfig.BACKGROUND_COLOR, fg=AppConfig.TEXT_COLOR,
                               font=(AppConfig.FONT_FAMILY, AppConfig.FONT_SIZE_SMALL))
-        status_bar.pack(side=tk.BOTTOM, fill=tk.X)
+        status_bar.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        ttk.Button(status_frame, text="Cancel Task", command=self.task_runner.cancel_all).pack(side=tk.RIGHT)
         
         # Create tabs
         self.create_tabs()
@@ -107,25 +136,25 @@ class MoodJournalApp:
         """Create all application tabs"""
         # Add Entry Tab
         self.add_entry_tab = AddEntryTab(
-            self.notebook, self.data_manager, self.moods, self.status_var
+            self.notebook, self.data_manager, self.moods, self.status_var, self.task_runner
         )
         self.notebook.add(self.add_entry_tab.get_tab(), text="Add Entry")
         
         # View Entries Tab
         self.view_entries_tab = ViewEntriesTab(
-            self.notebook, self.data_manager, self.moods, self.status_var
+            self.notebook, self.data_manager, self.moods, self.status_var, self.task_runner
         )
         self.notebook.add(self.view_entries_tab.get_tab(), text="View Entries")
         
         # Reports Tab
         self.reports_tab = ReportsTab(
-            self.notebook, self.data_manager, self.report_generator, self.status_var
+            self.notebook, self.data_manager, self.report_generator, self.status_var, self.task_runner
         )
         self.notebook.add(self.reports_tab.get_tab(), text="Reports")
         
         # Settings Tab
         self.settings_tab = SettingsTab(
-            self.notebook, self.data_manager, self.moods, self.status_var
+            self.notebook, self.data_manager, self.moods, self.status_var, self.task_runner
         )
         self.notebook.add(self.settings_tab.get_tab(), text="Settings")
     
@@ -136,3 +165,11 @@ class MoodJournalApp:
             self.view_entries_tab.refresh_entries()
         
         self.status_var.set(f"Loaded {len(self.data_manager.data)} entries")
+    
+    def on_close(self):
+        """Stop background work before closing the window"""
+        self.task_runner.shutdown()
+        # Coalesced writes still inside their debounce window go to disk now
+        self.data_manager.close()
+        self.report_generator.close_charts()
+        self.root.destroy()
\ No newline at end of file
@@ -3,19 +3,25 @@ Tab definitions for the main application
 """
 import tkinter as tk
 from tkinter import ttk, messagebox, simpledialog, filedialog
+from bisect import bisect_left, bisect_right
 from datetime import datetime
 from Configuration.settings import AppConfig
+from modules.entry import Entry, register_moods
 from utils.validators import Validators
+from utils.csv_exporter import CSVExporter
+from utils.entry_importer import EntryImporter
+from utils.instrumentation import instrumentation, instrumented
 from gui.widgets import DateEntry, FilterFrame
 
 class AddEntryTab:
     """Add Entry tab implementation"""
     
-    def __init__(self, parent, data_manager, moods, status_var):
+    def __init__(self, parent, data_manager, moods, status_var, task_runner):
         self.parent = parent
         self.data_manager = data_manager
         self.moods = moods
         self.status_var = status_var
+        self.task_runner = task_runner
         self.create_tab()
     
     def create_tab(self):
@@ -74,21 +80,25 @@ class AddEntryTab:
                 messagebox.showerror("Invalid Mood", "Please select a valid mood")
                 return
             
-            # Create and save entry
-            entry = {"date": date, "mood": mood, "notes": notes}
-            
-            if self.data_manager.add_entry(entry):
-                messagebox.showinfo("Success", "Entry added successfully!")
-                self.clear_form()
-                self.status_var.set(f"Entry added for {entry['date']}")
-            else:
-                # Remove the entry if save failed
-                if entry in self.data_manager.data:
-                    self.data_manager.data.remove(entry)
+            # Create and save entry; the write happens off the Tk thread
+            entry = Entry(date, mood, notes)
+            self.task_runner.submit(
+                "Saving entry", lambda task: self.data_manager.add_entry(entry),
+                on_success=lambda saved: self.on_entry_saved(saved, entry),
+                on_error=lambda e: messagebox.showerror("Error", f"Failed to add entry: {str(e)}"),
+                cancellable=False
+            )
                 
         except Exception as e:
             messagebox.showerror("Error", f"Failed to add entry: {str(e)}")
     
+    def on_entry_saved(self, saved, entry):
+        """Finish an add once the background save completes"""
+        if saved:
+            messagebox.showinfo("Success", "Entry added successfully!")
+            self.clear_form()
+            self.status_var.set(f"Entry added for {entry.date}")
+    
     def clear_form(self):
         """Clear the form"""
         self.date_entry.set_today()
@@ -100,14 +110,29 @@ class AddEntryTab:
         return self.tab
 
 class ViewEntriesTab:
-    """View Entries tab implementation"""
+    """View Entries tab implementation
+    
+    The treeview holds a sliding window of at most ENTRIES_MAX_ROWS rows over
+    filtered_entries, starting at window_start. Scrolling near either end pages
+    rows in on that side and releases the same number on the other.
+    """
     
-    def __init__(self, parent, data_manager, moods, status_var):
+    def __init__(self, parent, data_manager, moods, status_var, task_runner):
         self.parent = parent
         self.data_manager = data_manager
         self.moods = moods
         self.status_var = status_var
+        self.task_runner = task_runner
+        self.filtered_entries = []
+        self.current_filters = None
+        # filtered_entries[window_start:window_start + loaded_count] are the treeview rows
+        self.window_start = 0
+        self.loaded_count = 0
+        self.load_pending = False
         self.create_tab()
+        # Changes may be published from the background worker, so hop back to the Tk thread
+        self.data_changed_callback = self.task_runner.ui_callback(self.on_data_changed)
+        self.data_manager.subscribe(self.data_changed_callback)
     
     def create_tab(self):
         """Create the tab contents"""
@@ -140,11 +165,11 @@ class ViewEntriesTab:
         
         self.entries_tree.column("Notes", width=300)
         
-        # Scrollbar for treeview
-        scrollbar = ttk.Scrollbar(list_frame, orient=tk.VERTICAL, command=self.entries_tree.yview)
-        self.entries_tree.configure(yscrollcommand=scrollbar.set)
+        # Scrollbar for treeview; scrolling near the end pages in more rows
+        self.scrollbar = ttk.Scrollbar(list_frame, orient=tk.VERTICAL, command=self.entries_tree.yview)
+        self.entries_tree.configure(yscrollcommand=self.on_tree_scroll)
         self.entries_tree.pack(side=tk.LEFT, fill='both', expand=True)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
         
         # Button frame
         button_frame = ttk.Frame(list_frame)
@@ -157,46 +182,150 @@ class ViewEntriesTab:
         # Initial refresh
         self.refresh_entries()
     
+    @instrumented
     def refresh_entries(self, filters=None):
         """Refresh the entries list"""
         try:
             # Clear existing items
-            for item in self.entries_tree.get_children():
-                self.entries_tree.delete(item)
+            self.entries_tree.delete(*self.entries_tree.get_children())
             
             # Get filtered data
             if filters is None:
                 filters = self.filter_frame.get_filters()
+            self.current_filters = filters
             
-            # Apply simple filtering (you can enhance this)
-            filtered_data = []
-            for entry in self.data_manager.data:
-                include = True
-                
-                # Date filtering
-                if filters['start_date'] and entry['date'] < filters['start_date']:
-                    include = False
-                if filters['end_date'] and entry['date'] > filters['end_date']:
-                    include = False
-                if filters['mood'] != 'All' and entry['mood'] != filters['mood']:
-                    include = False
-                
-                if include:
-                    filtered_data.append(entry)
+            # Range/mood lookups go through the DataManager's sorted indexes
+            self.filtered_entries = self.data_manager.get_entries(filters)
+            self.window_start = 0
+            self.loaded_count = 0
             
-            # Add entries to treeview
-            for entry in filtered_data:
-                notes = entry.get('notes', '')
-                if len(notes) > AppConfig.NOTES_PREVIEW_LENGTH:
-                    notes = notes[:AppConfig.NOTES_PREVIEW_LENGTH] + "..."
-                
-                self.entries_tree.insert("", tk.END, values=(entry['date'], entry['mood'], notes))
+            # Only the first page is materialized; the rest is paged in on scroll
+            self.load_more_entries()
             
-            self.status_var.set(f"Displaying {len(filtered_data)} entries")
+            self.status_var.set(f"Displaying {len(self.filtered_entries)} entries")
             
         except Exception as e:
             messagebox.showerror("Error", f"Failed to refresh entries: {str(e)}")
     
+    def load_more_entries(self):
+        """Insert the next page of filtered entries into the treeview, releasing rows from the top"""
+        self.load_pending = False
+        end = self.window_start + self.loaded_count
+        page = self.filtered_entries[end:end + AppConfig.ENTRIES_PAGE_SIZE]
+        top_row = self.top_row()
+        for entry in page:
+            self.insert_entry_row(entry)
+        self.loaded_count += len(page)
+        
+        excess = self.loaded_count - AppConfig.ENTRIES_MAX_ROWS
+        if excess > 0:
+            self.entries_tree.delete(*self.entries_tree.get_children()[:excess])
+            self.window_start += excess
+            self.loaded_count -= excess
+            self.scroll_to_row(top_row - excess)
+    
+    def load_earlier_entries(self):
+        """Insert the previous page of filtered entries above the rows, releasing rows from the bottom"""
+        self.load_pending = False
+        start = max(0, self.window_start - AppConfig.ENTRIES_PAGE_SIZE)
+        page = self.filtered_entries[start:self.window_start]
+        top_row = self.top_row()
+        for index, entry in enumerate(page):
+            self.insert_entry_row(entry, index)
+        self.window_start = start
+        self.loaded_count += len(page)
+        
+        excess = self.loaded_count - AppConfig.ENTRIES_MAX_ROWS
+        if excess > 0:
+            self.entries_tree.delete(*self.entries_tree.get_children()[-excess:])
+            self.loaded_count -= excess
+        self.scroll_to_row(top_row + len(page))
+    
+    def top_row(self):
+        """Index within the treeview of the first visible row"""
+        return round(self.entries_tree.yview()[0] * self.loaded_count)
+    
+    def scroll_to_row(self, row):
+        """Keep the same entries in view after rows were added or released above them"""
+        if self.loaded_count:
+            self.entries_tree.yview_moveto(max(0, row) / self.loaded_count)
+    
+    def insert_entry_row(self, entry, index=tk.END):
+        """Insert a single entry as a treeview row"""
+        notes = entry.notes
+        if len(notes) > AppConfig.NOTES_PREVIEW_LENGTH:
+            notes = notes[:AppConfig.NOTES_PREVIEW_LENGTH] + "..."
+        
+        # The entry id doubles as the row's iid so rows map straight back to entries
+        return self.entries_tree.insert("", index, iid=entry.id,
+                                        values=(entry.date, entry.mood, notes))
+    
+    def on_data_changed(self, event, entry):
+        """Apply a DataManager change event to the treeview in place"""
+        try:
+            if event == "inserted":
+                self.insert_filtered_entry(entry)
+            elif event == "deleted":
+                self.remove_filtered_entry(entry)
+            else:
+                self.refresh_entries(self.current_filters)
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to update entries: {str(e)}")
+    
+    def insert_filtered_entry(self, entry):
+        """Insert a newly added entry at its sorted position if it matches the filters"""
+        if not self.data_manager.entry_matches(entry, self.current_filters):
+            return
+        
+        start = bisect_left(self.filtered_entries, entry.date, key=lambda e: e.date)
+        position = bisect_right(self.filtered_entries, entry.date, key=lambda e: e.date)
+        if any(self.filtered_entries[i].id == entry.id for i in range(start, position)):
+            # A refresh that ran after the add but before this event already shows it
+            return
+        
+        end = self.window_start + self.loaded_count
+        at_end = end >= len(self.filtered_entries)
+        self.filtered_entries.insert(position, entry)
+        
+        # Rows outside the window will be picked up when scrolled into view
+        if self.window_start <= position < end or (at_end and position == end):
+            self.insert_entry_row(entry, position - self.window_start)
+            self.loaded_count += 1
+        elif position < self.window_start:
+            self.window_start += 1
+    
+    def remove_filtered_entry(self, entry):
+        """Remove a deleted entry's row without rebuilding the tree"""
+        start = bisect_left(self.filtered_entries, entry.date, key=lambda e: e.date)
+        end = bisect_right(self.filtered_entries, entry.date, key=lambda e: e.date)
+        position = next((i for i in range(start, end)
+                         if self.filtered_entries[i].id == entry.id), None)
+        if position is None:
+            return
+        
+        del self.filtered_entries[position]
+        if self.entries_tree.exists(entry.id):
+            self.entries_tree.delete(entry.id)
+            self.loaded_count -= 1
+        elif position < self.window_start:
+            self.window_start -= 1
+    
+    def on_tree_scroll(self, first, last):
+        """Update the scrollbar and page in more rows when the view nears either end of the window"""
+        self.scrollbar.set(first, last)
+        if self.load_pending:
+            return
+        if (float(last) >= AppConfig.ENTRIES_FETCH_THRESHOLD
+                and self.window_start + self.loaded_count < len(self.filtered_entries)):
+            load = self.load_more_entries
+        elif float(first) <= 1 - AppConfig.ENTRIES_FETCH_THRESHOLD and self.window_start > 0:
+            load = self.load_earlier_entries
+        else:
+            return
+        # Defer the insert so it doesn't run inside the treeview's own redraw
+        self.load_pending = True
+        self.entries_tree.after_idle(load)
+    
     def apply_filters(self):
         """Apply filters to the entries list"""
         filters = self.filter_frame.get_filters()
@@ -218,44 +347,50 @@ class ViewEntriesTab:
                 return
             
             if messagebox.askyesno("Confirm Delete", "Are you sure you want to delete the selected entry?"):
-                # Find the actual index in the data manager
-                selected_item = selection[0]
-                item_values = self.entries_tree.item(selected_item, 'values')
-                date, mood, _ = item_values
-                
-                # Find the entry in the data
-                for i, entry in enumerate(self.data_manager.data):
-                    if entry['date'] == date and entry['mood'] == mood:
-                        deleted_entry = self.data_manager.delete_entry(i)
-                        if deleted_entry:
-                            self.refresh_entries()
-                            messagebox.showinfo("Success", "Entry deleted successfully")
-                            self.status_var.set(f"Deleted entry from {deleted_entry['date']}")
-                        break
+                # Row iids are entry ids, so the exact entry is deleted even if others share its date and mood
+                deleted_entry = self.data_manager.delete_entry_by_id(selection[0])
+                if deleted_entry:
+                    messagebox.showinfo("Success", "Entry deleted successfully")
+                    self.status_var.set(f"Deleted entry from {deleted_entry.date}")
                     
         except Exception as e:
             messagebox.showerror("Error", f"Failed to delete entry: {str(e)}")
     
     def export_to_csv(self):
-        """Export data to CSV file"""
+        """Export the currently filtered entries to a CSV file"""
         try:
+            # Exporting before the history is merged would leave out the older entries
+            self.data_manager.check_history_loaded()
             filename = simpledialog.askstring("Export CSV", "Enter filename (without extension):")
             if filename:
-                if not filename.endswith('.csv'):
-                    filename += '.csv'
+                # Names ending in .gz are written gzip-compressed
+                if not filename.endswith(('.csv', '.csv.gz')):
+                    filename += '.csv.gz' if AppConfig.EXPORT_COMPRESS else '.csv'
                 
-                with open(filename, 'w', encoding='utf-8') as file:
-                    file.write("Date,Mood,Notes\n")
-                    for entry in self.data_manager.data:
-                        notes = entry.get('notes', '').replace('"', '""')
-                        file.write(f'"{entry["date"]}","{entry["mood"]}","{notes}"\n')
-                
-                messagebox.showinfo("Success", f"Data exported to {filename}")
-                self.status_var.set(f"Data exported to {filename}")
+                self.task_runner.submit(
+                    "Exporting CSV", self.write_csv, filename, self.current_filters, len(self.filtered_entries),
+                    on_success=self.on_export_done,
+                    on_error=lambda e: messagebox.showerror("Export Error", f"Failed to export data: {str(e)}")
+                )
                 
         except Exception as e:
             messagebox.showerror("Export Error", f"Failed to export data: {str(e)}")
     
+    def write_csv(self, task, filename, filters, total):
+        """Stream the filtered entries to a CSV file (runs on the background worker)"""
+        def progress(rows):
+            task.check_cancelled()
+            task.report_progress(f"{rows} of {total} rows")
+        
+        entries = self.data_manager.iter_entries(filters)
+        CSVExporter().export(entries, filename, progress)
+        return filename
+    
+    def on_export_done(self, filename):
+        """Report a finished export"""
+        messagebox.showinfo("Success", f"Data exported to {filename}")
+        self.status_var.set(f"Data exported to {filename}")
+    
     def get_tab(self):
         """Get the tab widget"""
         return self.tab
@@ -263,11 +398,12 @@ class ViewEntriesTab:
 class ReportsTab:
     """Reports tab implementation"""
     
-    def __init__(self, parent, data_manager, report_generator, status_var):
+    def __init__(self, parent, data_manager, report_generator, status_var, task_runner):
         self.parent = parent
         self.data_manager = data_manager
         self.report_generator = report_generator
         self.status_var = status_var
+        self.task_runner = task_runner
         self.current_canvas = None
         self.create_tab()
     
@@ -299,26 +435,48 @@ class ReportsTab:
     def generate_report(self):
         """Generate the selected report"""
         try:
-            # Clear previous report
-            for widget in self.report_frame.winfo_children():
-                widget.destroy()
+            # Clear previous report (chart canvases are hidden and reused)
+            self.report_generator.clear_report_frame(self.report_frame)
             
             if not self.data_manager.data:
                 messagebox.showwarning("No Data", "No journal entries available for reporting")
                 return
+            self.data_manager.check_history_loaded()
             
             report_type = self.report_var.get()
             
+            # Aggregate in the background; charts are drawn back on the Tk thread
+            self.task_runner.submit(
+                f"Generating {report_type} report", self.build_report, report_type,
+                on_success=lambda report_data: self.show_report(report_type, report_data),
+                on_error=lambda e: messagebox.showerror("Error", f"Failed to generate report: {str(e)}")
+            )
+            
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to generate report: {str(e)}")
+    
+    def build_report(self, task, report_type):
+        """Compute the data behind a report (runs on the background worker)"""
+        self.data_manager.check_history_loaded()
+        if report_type == "summary":
+            return self.report_generator.get_mood_counts()
+        elif report_type == "timeline":
+            return self.report_generator.get_timeline_data()
+        elif report_type == "weekly":
+            return self.report_generator.generate_weekly_report_text()
+        elif report_type == "monthly":
+            return self.report_generator.generate_monthly_report_text()
+        return None
+    
+    def show_report(self, report_type, report_data):
+        """Render a computed report into the display area"""
+        try:
             if report_type == "summary":
-                self.report_generator.generate_summary_report(self.report_frame)
+                self.report_generator.generate_summary_report(self.report_frame, report_data)
             elif report_type == "timeline":
-                self.report_generator.generate_timeline_report(self.report_frame)
-            elif report_type == "weekly":
-                report_text = self.report_generator.generate_weekly_report_text()
-                self.report_generator.generate_text_report(self.report_frame, report_text)
-            elif report_type == "monthly":
-                report_text = self.report_generator.generate_monthly_report_text()
-                self.report_generator.generate_text_report(self.report_frame, report_text)
+                self.report_generator.generate_timeline_report(self.report_frame, report_data)
+            elif report_type in ("weekly", "monthly"):
+                self.report_generator.generate_text_report(self.report_frame, report_data)
                 
             self.status_var.set(f"Generated {report_type} report")
             
@@ -332,11 +490,13 @@ class ReportsTab:
 class SettingsTab:
     """Settings tab implementation"""
     
-    def __init__(self, parent, data_manager, moods, status_var):
+    def __init__(self, parent, data_manager, moods, status_var, task_runner):
         self.parent = parent
         self.data_manager = data_manager
         self.moods = moods
         self.status_var = status_var
+        self.task_runner = task_runner
+        self.backups_tree = None  # Set while the backup history window is open
         self.create_tab()
     
     def create_tab(self):
@@ -351,7 +511,10 @@ class SettingsTab:
         data_frame.pack(fill='x', pady=5)
         
         ttk.Button(data_frame, text="Backup Data", command=self.backup_data).pack(side=tk.LEFT, padx=5)
+        ttk.Button(data_frame, text="Backup History", command=self.show_backup_history).pack(side=tk.LEFT, padx=5)
         ttk.Button(data_frame, text="Restore Data", command=self.restore_data).pack(side=tk.LEFT, padx=5)
+        ttk.Button(data_frame, text="Import Entries", command=self.import_entries).pack(side=tk.LEFT, padx=5)
+        ttk.Button(data_frame, text="Compact Journal", command=self.compact_data).pack(side=tk.LEFT, padx=5)
         ttk.Button(data_frame, text="Clear All Data", command=self.clear_all_data).pack(side=tk.LEFT, padx=5)
         
         # Custom moods
@@ -363,6 +526,35 @@ class SettingsTab:
         ttk.Entry(moods_frame, textvariable=self.custom_mood_var, width=15).pack(side=tk.LEFT, padx=5)
         ttk.Button(moods_frame, text="Add", command=self.add_custom_mood).pack(side=tk.LEFT, padx=5)
         
+        # Performance diagnostics
+        diagnostics_frame = ttk.LabelFrame(main_frame, text="Performance Diagnostics", padding=10)
+        diagnostics_frame.pack(fill='x', pady=5)
+        
+        options_frame = ttk.Frame(diagnostics_frame)
+        options_frame.pack(fill='x')
+        self.record_timings_var = tk.BooleanVar(value=instrumentation.enabled)
+        self.trace_memory_var = tk.BooleanVar(value=instrumentation.trace_memory or AppConfig.INSTRUMENTATION_TRACE_MEMORY)
+        ttk.Checkbutton(options_frame, text="Record timings", variable=self.record_timings_var,
+                        command=self.toggle_instrumentation).pack(side=tk.LEFT, padx=5)
+        ttk.Checkbutton(options_frame, text="Trace allocations", variable=self.trace_memory_var,
+                        command=self.toggle_instrumentation).pack(side=tk.LEFT, padx=5)
+        
+        columns = ("Operation", "Calls", "Mean ms", "Max ms", "Last ms", "Last alloc KB")
+        self.timings_tree = ttk.Treeview(diagnostics_frame, columns=columns, show="headings", height=5)
+        for col in columns:
+            self.timings_tree.heading(col, text=col)
+            self.timings_tree.column(col, width=80, anchor=tk.E)
+        self.timings_tree.column("Operation", width=220, anchor=tk.W)
+        self.timings_tree.pack(fill='x', pady=5)
+        
+        timings_button_frame = ttk.Frame(diagnostics_frame)
+        timings_button_frame.pack(fill='x')
+        ttk.Button(timings_button_frame, text="Refresh", command=self.refresh_timings).pack(side=tk.LEFT, padx=5)
+        ttk.Button(timings_button_frame, text="Dump to File", command=self.dump_timings).pack(side=tk.LEFT, padx=5)
+        ttk.Button(timings_button_frame, text="Clear", command=self.clear_timings).pack(side=tk.LEFT, padx=5)
+        ttk.Button(timings_button_frame, text="Profile Next Action", command=self.profile_next_action).pack(side=tk.LEFT, padx=5)
+        ttk.Button(timings_button_frame, text="View Last Profile", command=self.show_last_profile).pack(side=tk.LEFT, padx=5)
+        
         # About section
         about_frame = ttk.LabelFrame(main_frame, text="About", padding=10)
         about_frame.pack(fill='x', pady=5)
@@ -372,30 +564,203 @@ class SettingsTab:
     
     def backup_data(self):
         """Create a backup of the data file"""
+        self.task_runner.submit(
+            "Creating backup", lambda task: self.data_manager.backup_data(),
+            on_success=self.on_backup_done,
+            on_error=lambda e: messagebox.showerror("Backup Error", f"Failed to create backup: {str(e)}"),
+            cancellable=False
+        )
+    
+    def on_backup_done(self, backup_name):
+        """Report a finished backup"""
+        messagebox.showinfo("Backup Complete", f"Backup created: {backup_name}")
+        self.status_var.set(f"Backup created: {backup_name}")
+        self.refresh_open_backups()
+    
+    def show_backup_history(self):
+        """List incremental backups, with point-in-time restore, squash and prune"""
+        window = tk.Toplevel(self.tab)
+        window.title("Backup History")
+        
+        columns = ("Backup", "Time", "Type", "Entries", "Added", "Removed")
+        self.backups_tree = ttk.Treeview(window, columns=columns, show="headings", height=12,
+                                         selectmode='browse')
+        for col in columns:
+            self.backups_tree.heading(col, text=col)
+            self.backups_tree.column(col, width=80, anchor=tk.E)
+        self.backups_tree.column("Time", width=160, anchor=tk.W)
+        self.backups_tree.column("Type", anchor=tk.W)
+        self.backups_tree.pack(fill='both', expand=True, padx=10, pady=10)
+        
+        button_frame = ttk.Frame(window)
+        button_frame.pack(fill='x', padx=10, pady=(0, 10))
+        ttk.Button(button_frame, text="Restore Selected", command=self.restore_selected_backup).pack(side=tk.LEFT, padx=5)
+        ttk.Button(button_frame, text="Squash Older", command=self.squash_backups).pack(side=tk.LEFT, padx=5)
+        ttk.Label(button_frame, text="Keep newest:").pack(side=tk.LEFT, padx=(15, 5))
+        self.keep_backups_var = tk.IntVar(value=10)
+        ttk.Spinbox(button_frame, from_=1, to=1000, width=5, textvariable=self.keep_backups_var).pack(side=tk.LEFT)
+        ttk.Button(button_frame, text="Prune", command=self.prune_backups).pack(side=tk.LEFT, padx=5)
+        
+        self.refresh_backups()
+    
+    def refresh_backups(self):
+        """Fill the backup history list, newest first"""
+        self.backups_tree.delete(*self.backups_tree.get_children())
         try:
-            backup_name = self.data_manager.backup_data()
-            messagebox.showinfo("Backup Complete", f"Backup created: {backup_name}")
-            self.status_var.set(f"Backup created: {backup_name}")
+            backups = self.data_manager.list_backups()
         except Exception as e:
-            messagebox.showerror("Backup Error", f"Failed to create backup: {str(e)}")
+            messagebox.showerror("Backup Error", f"Failed to read backups: {str(e)}")
+            return
+        for record in reversed(backups):
+            self.backups_tree.insert('', tk.END, iid=str(record['id']), values=(
+                f"#{record['id']}", record['timestamp'].replace("T", " "), record['kind'],
+                record['entries'], record['added'], record['removed']
+            ))
+    
+    def get_selected_backup(self):
+        """Id of the backup selected in the history list, or None"""
+        selection = self.backups_tree.selection()
+        if not selection:
+            messagebox.showwarning("No Selection", "Please select a backup")
+            return None
+        return int(selection[0])
+    
+    def restore_selected_backup(self):
+        """Restore the journal to the selected backup"""
+        backup_id = self.get_selected_backup()
+        if backup_id is None:
+            return
+        if messagebox.askyesno("Confirm Restore", f"Replace the journal with backup #{backup_id}?"):
+            self.task_runner.submit(
+                "Restoring backup", lambda task: self.data_manager.restore_backup(backup_id),
+                on_success=self.on_restore_done,
+                on_error=lambda e: messagebox.showerror("Restore Error", f"Failed to restore data: {str(e)}"),
+                cancellable=False
+            )
+    
+    def squash_backups(self):
+        """Fold every backup up to the selected one into a single base"""
+        backup_id = self.get_selected_backup()
+        if backup_id is None:
+            return
+        if messagebox.askyesno("Confirm Squash", f"Merge all backups up to #{backup_id}? "
+                               "Earlier points in time will no longer be restorable."):
+            self.task_runner.submit(
+                "Squashing backups", lambda task: self.data_manager.squash_backups(backup_id),
+                on_success=self.on_backups_pruned,
+                on_error=lambda e: messagebox.showerror("Backup Error", f"Failed to squash backups: {str(e)}"),
+                cancellable=False
+            )
+    
+    def prune_backups(self):
+        """Keep only the newest backups"""
+        try:
+            keep = self.keep_backups_var.get()
+        except tk.TclError:
+            messagebox.showwarning("Invalid", "Please enter how many backups to keep")
+            return
+        if messagebox.askyesno("Confirm Prune", f"Keep only the newest {keep} backups?"):
+            self.task_runner.submit(
+                "Pruning backups", lambda task: self.data_manager.prune_backups(keep),
+                on_success=self.on_backups_pruned,
+                on_error=lambda e: messagebox.showerror("Backup Error", f"Failed to prune backups: {str(e)}"),
+                cancellable=False
+            )
+    
+    def on_backups_pruned(self, removed):
+        """Report a finished squash or prune"""
+        self.status_var.set(f"Removed {removed} old backups")
+        self.refresh_open_backups()
+    
+    def refresh_open_backups(self):
+        """Refresh the backup history list if its window is still open"""
+        if self.backups_tree is not None and self.backups_tree.winfo_exists():
+            self.refresh_backups()
     
     def restore_data(self):
         """Restore data from a backup file"""
         try:
             filename = filedialog.askopenfilename(
                 title="Select backup file", 
-                filetypes=[("JSON files", "*.json"), ("All files", "*.*")]
+                filetypes=[("JSON files", "*.json"), ("Journal logs", "*" + AppConfig.LOG_EXTENSION),
+                           ("All files", "*.*")]
             )
             if filename:
-                if self.data_manager.restore_data(filename):
-                    messagebox.showinfo("Restore Complete", "Data restored successfully")
-                    self.status_var.set("Data restored from backup")
-                else:
-                    messagebox.showerror("Restore Error", "Failed to restore data")
+                self.task_runner.submit(
+                    "Restoring backup", lambda task: self.data_manager.restore_data(filename),
+                    on_success=self.on_restore_done,
+                    on_error=lambda e: messagebox.showerror("Restore Error", f"Failed to restore data: {str(e)}"),
+                    cancellable=False
+                )
                     
         except Exception as e:
             messagebox.showerror("Restore Error", f"Failed to restore data: {str(e)}")
     
+    def on_restore_done(self, restored):
+        """Report a finished restore"""
+        if restored:
+            messagebox.showinfo("Restore Complete", "Data restored successfully")
+            self.status_var.set("Data restored from backup")
+        else:
+            messagebox.showerror("Restore Error", "Failed to restore data")
+    
+    def import_entries(self):
+        """Bulk import entries from a CSV or JSON Lines file"""
+        try:
+            self.data_manager.check_history_loaded()
+            filename = filedialog.askopenfilename(
+                title="Select file to import",
+                filetypes=[("CSV files", "*.csv *.csv.gz"), ("JSON Lines", "*.jsonl *.jsonl.gz"),
+                           ("All files", "*.*")]
+            )
+            if filename:
+                dedupe = messagebox.askyesno("Import Entries", "Skip entries that duplicate existing ones?")
+                self.task_runner.submit(
+                    "Importing entries", self.run_import, filename, list(self.moods), dedupe,
+                    on_success=self.on_import_done,
+                    on_error=lambda e: messagebox.showerror("Import Error", f"Failed to import entries: {str(e)}"),
+                    cancellable=False
+                )
+                
+        except Exception as e:
+            messagebox.showerror("Import Error", f"Failed to import entries: {str(e)}")
+    
+    def run_import(self, task, filename, moods, dedupe):
+        """Read, validate and store an import file (runs on the background worker)"""
+        def progress(rows):
+            task.report_progress(f"{rows} rows read")
+        
+        return self.data_manager.import_entries(EntryImporter.read(filename), moods, dedupe, progress)
+    
+    def on_import_done(self, result):
+        """Report a finished import"""
+        message = f"Imported {result['imported']} entries"
+        if result['duplicates']:
+            message += f", skipped {result['duplicates']} duplicates"
+        if result['invalid']:
+            message += f", skipped {result['invalid']} invalid rows"
+            details = "\n".join(f"Line {line}: {error}" for line, error in result['errors'][:10])
+            messagebox.showwarning("Import Complete", f"{message}\n\n{details}")
+        else:
+            messagebox.showinfo("Import Complete", message)
+        self.status_var.set(message)
+    
+    def compact_data(self):
+        """Fold the journal log into a clean snapshot"""
+        # Rewrites the whole snapshot, so keep it off the Tk thread
+        self.task_runner.submit(
+            "Compacting journal", lambda task: self.data_manager.compact_data(),
+            on_success=self.on_compact_done,
+            cancellable=False
+        )
+    
+    def on_compact_done(self, compacted):
+        """Report a finished compaction"""
+        if compacted:
+            self.status_var.set("Journal compacted")
+        else:
+            messagebox.showerror("Error", "Failed to compact journal")
+    
     def clear_all_data(self):
         """Clear all journal data"""
         if messagebox.askyesno("Confirm Clear", "Are you sure you want to delete ALL journal entries? This cannot be undone."):
@@ -405,11 +770,76 @@ class SettingsTab:
             else:
                 messagebox.showerror("Error", "Failed to clear data")
     
+    def toggle_instrumentation(self):
+        """Apply the diagnostics checkboxes"""
+        instrumentation.set_enabled(self.record_timings_var.get(), self.trace_memory_var.get())
+        state = "on" if instrumentation.enabled else "off"
+        self.status_var.set(f"Timing instrumentation {state}")
+    
+    def refresh_timings(self):
+        """Show per-operation timings from the instrumentation buffer"""
+        self.timings_tree.delete(*self.timings_tree.get_children())
+        # One snapshot for both, so an operation recorded in between can't be missing from last
+        records = instrumentation.get_records()
+        last = {}
+        for record in records:
+            last[record['operation']] = record
+        for operation, stats in sorted(instrumentation.summarize(records).items()):
+            record = last[operation]
+            self.timings_tree.insert('', tk.END, values=(
+                operation, stats['count'], f"{stats['mean_ms']:.2f}", f"{stats['max_ms']:.2f}",
+                f"{record['duration_ms']:.2f}", record.get('allocated_kb', "")
+            ))
+    
+    def dump_timings(self):
+        """Write the instrumentation buffer to a JSON file"""
+        filename = filedialog.asksaveasfilename(
+            defaultextension=".json",
+            initialfile=AppConfig.INSTRUMENTATION_DUMP_FILENAME,
+            filetypes=[("JSON files", "*.json"), ("All files", "*.*")]
+        )
+        if filename:
+            try:
+                instrumentation.dump(filename)
+                self.status_var.set(f"Timings written to {filename}")
+            except OSError as e:
+                messagebox.showerror("Dump Error", f"Failed to write timings: {str(e)}")
+    
+    def clear_timings(self):
+        """Empty the instrumentation buffer"""
+        instrumentation.clear()
+        self.refresh_timings()
+    
+    def profile_next_action(self):
+        """Capture a cProfile of the next instrumented operation"""
+        instrumentation.profile_next()
+        self.status_var.set("The next journal, view or report action will be profiled")
+    
+    def show_last_profile(self):
+        """Show the text summary of the last cProfile capture"""
+        profile = instrumentation.last_profile
+        if profile is None:
+            messagebox.showinfo("Profile", "No profile captured yet. Use Profile Next Action first.")
+            return
+        
+        window = tk.Toplevel(self.tab)
+        window.title(f"Profile: {profile['operation']}")
+        text_widget = tk.Text(window, wrap=tk.NONE, width=110, height=30)
+        scrollbar = ttk.Scrollbar(window, orient=tk.VERTICAL, command=text_widget.yview)
+        text_widget.configure(yscrollcommand=scrollbar.set)
+        text_widget.pack(side=tk.LEFT, fill='both', expand=True)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        if profile['filename']:
+            text_widget.insert(tk.END, f"Saved to {profile['filename']}\n\n")
+        text_widget.insert(tk.END, profile['summary'])
+        text_widget.config(state=tk.DISABLED)
+    
     def add_custom_mood(self):
         """Add a custom mood to the available moods list"""
         custom_mood = self.custom_mood_var.get().strip()
         if custom_mood and custom_mood not in self.moods:
             self.moods.append(custom_mood)
+            register_moods([custom_mood])
             self.custom_mood_var.set("")
             messagebox.showinfo("Success", f"Custom mood '{custom_mood}' added")
             self.status_var.set(f"Custom mood '{custom_mood}' added")
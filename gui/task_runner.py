@@ -0,0 +1,152 @@
+"""
+Background task execution bridged back to the Tk event loop
+"""
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from tkinter import messagebox
+from Configuration.settings import AppConfig
+
+class TaskCancelled(Exception):
+    """Raised inside a task when it notices it has been cancelled"""
+
+class Task:
+    """Handle for a job running on the background executor"""
+
+    def __init__(self, name, events, cancellable=True):
+        self.name = name
+        self.events = events
+        # Journal writes are not cancellable: they always run, even at shutdown
+        self.cancellable = cancellable
+        self.cancel_event = threading.Event()
+        self.future = None
+
+    def cancel(self):
+        """Cancel the task: queued tasks never start, running ones stop at their next check"""
+        self.cancel_event.set()
+        if self.future is not None:
+            self.future.cancel()
+
+    @property
+    def cancelled(self):
+        """Whether cancellation has been requested"""
+        return self.cancel_event.is_set()
+
+    def check_cancelled(self):
+        """Raise TaskCancelled if cancellation has been requested"""
+        if self.cancel_event.is_set():
+            raise TaskCancelled()
+
+    def report_progress(self, message):
+        """Post a progress message to the status bar (safe to call from the worker)"""
+        self.events.put(('progress', self, message))
+
+class TaskRunner:
+    """Runs slow work off the Tk thread and delivers results back via root.after polling"""
+
+    def __init__(self, root, status_var):
+        self.root = root
+        self.status_var = status_var
+        self.events = queue.Queue()
+        self.tasks = set()
+        self.ui_thread = threading.current_thread()
+        # One worker keeps journal writes in submission order
+        self.executor = ThreadPoolExecutor(max_workers=AppConfig.TASK_WORKERS)
+        self.poll_id = self.root.after(AppConfig.TASK_POLL_INTERVAL_MS, self.poll)
+
+    def submit(self, name, func, *args, on_success=None, on_error=None, cancellable=True):
+        """Run func(task, *args) in the background
+
+        on_success(result) and on_error(exception) are called on the Tk thread.
+        Pass cancellable=False for work that changes the journal, so neither
+        Cancel Task nor closing the window can drop it.
+        """
+        task = Task(name, self.events, cancellable)
+        self.tasks.add(task)
+        task.future = self.executor.submit(self.run_task, task, func, args, on_success, on_error)
+        self.status_var.set(f"{name}...")
+        return task
+
+    def run_task(self, task, func, args, on_success, on_error):
+        """Worker-side wrapper that turns the outcome into an event"""
+        try:
+            task.check_cancelled()
+            result = func(task, *args)
+            task.check_cancelled()
+            self.events.put(('done', task, (result, on_success)))
+        except TaskCancelled:
+            self.events.put(('cancelled', task, None))
+        except Exception as e:
+            self.events.put(('error', task, (e, on_error)))
+
+    def call_in_ui(self, func, *args):
+        """Run func(*args) on the Tk thread, immediately if already there"""
+        if threading.current_thread() is self.ui_thread:
+            func(*args)
+        else:
+            self.events.put(('call', None, (func, args)))
+
+    def ui_callback(self, func):
+        """Wrap func so it always runs on the Tk thread"""
+        return lambda *args: self.call_in_ui(func, *args)
+
+    def drain_events(self):
+        """Handle every pending worker event on the Tk thread"""
+        try:
+            while True:
+                kind, task, payload = self.events.get_nowait()
+                self.handle_event(kind, task, payload)
+        except queue.Empty:
+            pass
+
+    def poll(self):
+        """Drain pending events on the Tk thread, then reschedule"""
+        self.drain_events()
+        self.poll_id = self.root.after(AppConfig.TASK_POLL_INTERVAL_MS, self.poll)
+
+    def handle_event(self, kind, task, payload):
+        """Apply a single worker event to the UI"""
+        if kind == 'call':
+            func, args = payload
+            func(*args)
+        elif kind == 'progress':
+            if not task.cancelled:
+                self.status_var.set(f"{task.name}: {payload}")
+        elif kind == 'done':
+            self.tasks.discard(task)
+            result, on_success = payload
+            self.status_var.set(f"{task.name} complete")
+            if on_success:
+                on_success(result)
+        elif kind == 'cancelled':
+            self.tasks.discard(task)
+            self.status_var.set(f"{task.name} cancelled")
+        elif kind == 'error':
+            self.tasks.discard(task)
+            error, on_error = payload
+            self.status_var.set(f"{task.name} failed")
+            if on_error:
+                on_error(error)
+            else:
+                messagebox.showerror("Error", f"{task.name} failed: {str(error)}")
+
+    def cancel_all(self):
+        """Request cancellation of every queued or running cancellable task"""
+        for task in list(self.tasks):
+            if not task.cancellable:
+                continue
+            task.cancel()
+            # Tasks cancelled before starting never report back
+            if task.future.cancelled():
+                self.events.put(('cancelled', task, None))
+
+    def shutdown(self):
+        """Cancel what can be cancelled and wait for the remaining tasks to finish
+
+        Queued journal writes still run; their results and any errors they
+        report are delivered before this returns.
+        """
+        self.cancel_all()
+        self.root.after_cancel(self.poll_id)
+        self.executor.shutdown(wait=True)
+        self.drain_events()
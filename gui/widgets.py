@@ -61,17 +61,25 @@ class FilterFrame(ttk.LabelFrame):
         ttk.Combobox(self, textvariable=self.mood_var, 
                     values=["All"] + self.moods, width=12).grid(row=0, column=5, padx=5)
         self.mood_var.set("All")
+        
+        # Notes search: every word must appear; a trailing * matches by prefix
+        ttk.Label(self, text="Notes:").grid(row=1, column=0, sticky=tk.W, padx=5, pady=(5, 0))
+        self.text_var = tk.StringVar()
+        ttk.Entry(self, textvariable=self.text_var, width=40).grid(row=1, column=1, columnspan=5,
+                                                                   sticky=tk.W, padx=5, pady=(5, 0))
     
     def get_filters(self):
         """Get current filter values"""
         return {
             'start_date': self.start_date_var.get(),
             'end_date': self.end_date_var.get(),
-            'mood': self.mood_var.get()
+            'mood': self.mood_var.get(),
+            'text': self.text_var.get()
         }
     
     def clear_filters(self):
         """Clear all filters"""
         self.start_date_var.set("")
         self.end_date_var.set(datetime.today().strftime(AppConfig.DATE_FORMAT))
-        self.mood_var.set("All")
\ No newline at end of file
+        self.mood_var.set("All")
+        self.text_var.set("")
\ No newline at end of file
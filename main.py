@@ -2,15 +2,25 @@
 """
 Main entry point for the Mood Journal Application
 """
+import time
+STARTUP_START = time.perf_counter()  # Taken before any other import so the report covers them
+
 import tkinter as tk
 from tkinter import messagebox
 from gui.main_window import MoodJournalApp
+from utils.startup_timer import StartupTimer
 
 def main():
     """Main function to start the application"""
     try:
+        timer = StartupTimer(STARTUP_START)
+        timer.mark("imports")
         root = tk.Tk()
+        timer.mark("tk root")
         app = MoodJournalApp(root)
+        timer.mark("app built")
+        # Idle callbacks run once the initial window has been drawn
+        root.after_idle(timer.finish)
         root.mainloop()
     except Exception as e:
         messagebox.showerror("Fatal Error", f"Application failed to start: {str(e)}")
@@ -0,0 +1,71 @@
+"""
+Running mood aggregates maintained as entries are added and deleted
+"""
+from modules.date_keys import get_date_keys
+
+class MoodAggregates:
+    """Mood counts overall, per ISO week and per month, updated in O(1) per change"""
+
+    def __init__(self, entries=()):
+        self.rebuild(entries)
+
+    def rebuild(self, entries):
+        """Recount everything from scratch"""
+        self.mood_counts = {}
+        self.weekly_counts = {}
+        self.monthly_counts = {}
+        for entry in entries:
+            self.add(entry)
+
+    def load_counts(self, mood_counts, weekly_counts, monthly_counts):
+        """Replace the aggregates with counts computed elsewhere (e.g. vectorized)"""
+        self.mood_counts = mood_counts
+        self.weekly_counts = weekly_counts
+        self.monthly_counts = monthly_counts
+
+    def add(self, entry):
+        """Count a newly added entry"""
+        self.update(entry, 1)
+
+    def remove(self, entry):
+        """Uncount a deleted entry"""
+        self.update(entry, -1)
+
+    def update(self, entry, delta):
+        """Apply delta to every aggregate the entry belongs to"""
+        mood = entry['mood']
+        self.bump(self.mood_counts, mood, delta)
+
+        period_keys = self.get_period_keys(entry['date'])
+        if period_keys is None:
+            # Reports have always skipped entries with unparseable dates
+            return
+        week_key, month_key = period_keys
+        self.bump_period(self.weekly_counts, week_key, mood, delta)
+        self.bump_period(self.monthly_counts, month_key, mood, delta)
+
+    @staticmethod
+    def get_period_keys(date_str):
+        """Get the ("YYYY-Www", "YYYY-MM") keys for a date, or None if it doesn't parse"""
+        # Parsed once per distinct date string, not once per entry per pass
+        date_keys = get_date_keys(date_str)
+        if date_keys is None:
+            return None
+        return date_keys.week_key, date_keys.month_key
+
+    @staticmethod
+    def bump(counts, key, delta):
+        """Adjust a count, dropping it once it reaches zero"""
+        count = counts.get(key, 0) + delta
+        if count > 0:
+            counts[key] = count
+        else:
+            counts.pop(key, None)
+
+    @classmethod
+    def bump_period(cls, period_counts, period_key, mood, delta):
+        """Adjust a mood count within one period, dropping empty periods"""
+        moods = period_counts.setdefault(period_key, {})
+        cls.bump(moods, mood, delta)
+        if not moods:
+            del period_counts[period_key]
@@ -0,0 +1,238 @@
+"""
+Incremental, content-addressed journal backups
+"""
+import gzip
+import hashlib
+import json
+import os
+import threading
+from collections import Counter
+from datetime import datetime
+from Configuration.settings import AppConfig
+from modules.entry import Entry
+from modules.storage import write_atomic, write_json_atomic
+
+def entry_hash(entry):
+    """Content hash of an entry, stable across key order and whitespace"""
+    if isinstance(entry, Entry):
+        entry = entry.to_dict()
+    text = json.dumps(entry, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=16).hexdigest()
+
+def apply_delta(order, removed, added):
+    """Drop the removed hashes (as a multiset) from order and append the added ones"""
+    pending = Counter(removed)
+    result = []
+    for digest in order:
+        if pending[digest]:
+            pending[digest] -= 1
+        else:
+            result.append(digest)
+    result.extend(added)
+    return result
+
+class BackupStore:
+    """A base snapshot followed by deltas of the entries added and removed since
+
+    Each backup file is gzipped JSON holding the journal order (base) or the
+    removed/added hashes (delta), plus the bodies of entries whose content is
+    new to the chain; unchanged entries are never written twice. A fresh base
+    starts after AppConfig.BACKUP_MAX_DELTAS deltas, and squash folds older
+    backups into a new base so the chain can be pruned.
+    """
+
+    MANIFEST_FILENAME = "manifest.json"
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.lock = threading.Lock()
+        # Order and known hashes of the newest backup, rebuilt from disk on first use
+        self.head = None
+
+    def path(self, filename):
+        """Path of a file inside the backup directory"""
+        return os.path.join(self.directory, filename)
+
+    def list_backups(self):
+        """Manifest records, oldest first"""
+        try:
+            with open(self.path(self.MANIFEST_FILENAME), 'r') as file:
+                return json.load(file)['backups']
+        except FileNotFoundError:
+            return []
+
+    def save_manifest(self, records):
+        """Atomically replace the manifest"""
+        write_json_atomic(self.path(self.MANIFEST_FILENAME), {'version': 1, 'backups': records})
+
+    def read_backup(self, record):
+        """Read one backup file"""
+        with gzip.open(self.path(record['file']), 'rt', encoding='utf-8') as file:
+            return json.load(file)
+
+    def write_backup(self, filename, data):
+        """Atomically write one gzipped backup file"""
+        def write(file):
+            with gzip.GzipFile(fileobj=file, mode='wb', mtime=0,
+                               compresslevel=AppConfig.BACKUP_COMPRESS_LEVEL) as archive:
+                archive.write(json.dumps(data, separators=(',', ':'), default=Entry.to_dict).encode('utf-8'))
+        write_atomic(self.path(filename), write, mode='wb')
+
+    @staticmethod
+    def find(records, backup_id):
+        """Index of a backup in the manifest"""
+        for index, record in enumerate(records):
+            if record['id'] == backup_id:
+                return index
+        raise ValueError(f"No backup #{backup_id}")
+
+    def replay(self, records, index):
+        """Rebuild (order, objects, deltas since base) at records[index] from its base onwards"""
+        base = index
+        while records[base]['kind'] != 'base':
+            base -= 1
+            if base < 0:
+                raise ValueError("Backup chain has no base snapshot")
+
+        order = []
+        objects = {}
+        for record in records[base:index + 1]:
+            data = self.read_backup(record)
+            objects.update(data['objects'])
+            if record['kind'] == 'base':
+                order = data['order']
+            else:
+                order = apply_delta(order, data['removed'], data['added'])
+        return order, objects, index - base
+
+    def get_head(self, records):
+        """State of the newest backup, or None if there are no backups"""
+        if self.head is None and records:
+            order, objects, chain = self.replay(records, len(records) - 1)
+            self.head = {'order': order, 'known': set(objects), 'chain': chain}
+        return self.head
+
+    def create(self, entries):
+        """Back up entries as a delta against the newest backup (or as a base)
+
+        Returns (record, created); created is False when nothing changed since
+        the newest backup, in which case no file is written.
+        """
+        hashes = [entry_hash(entry) for entry in entries]
+        with self.lock:
+            os.makedirs(self.directory, exist_ok=True)
+            records = self.list_backups()
+            head = self.get_head(records)
+            if head is not None and head['order'] == hashes:
+                return records[-1], False
+
+            backup_id = records[-1]['id'] + 1 if records else 1
+            removed, added = [], hashes
+            kind = 'base'
+            if head is not None and head['chain'] < AppConfig.BACKUP_MAX_DELTAS:
+                removed = list((Counter(head['order']) - Counter(hashes)).elements())
+                remaining = Counter(head['order']) - Counter(removed)
+                added = []
+                for digest in hashes:
+                    if remaining[digest]:
+                        remaining[digest] -= 1
+                    else:
+                        added.append(digest)
+                # Reordered journals (e.g. after a restore) can't be expressed as a delta
+                if apply_delta(head['order'], removed, added) == hashes:
+                    kind = 'delta'
+                else:
+                    removed, added = [], hashes
+
+            known = head['known'] if kind == 'delta' else set()
+            wanted = set(added) - known
+            objects = {}
+            for digest, entry in zip(hashes, entries):
+                if digest in wanted:
+                    objects[digest] = entry
+            data = {'kind': kind, 'objects': objects}
+            if kind == 'base':
+                data['order'] = hashes
+            else:
+                data['removed'] = removed
+                data['added'] = added
+
+            filename = f"{backup_id:06d}_{kind}.json.gz"
+            self.write_backup(filename, data)
+            record = {
+                'id': backup_id,
+                'timestamp': datetime.now().isoformat(timespec='seconds'),
+                'kind': kind,
+                'file': filename,
+                'entries': len(hashes),
+                'added': len(added),
+                'removed': len(removed),
+            }
+            records.append(record)
+            self.save_manifest(records)
+
+            if kind == 'base':
+                self.head = {'order': hashes, 'known': set(objects), 'chain': 0}
+            else:
+                head['known'].update(objects)
+                self.head = {'order': hashes, 'known': head['known'], 'chain': head['chain'] + 1}
+            return record, True
+
+    def reconstruct(self, backup_id):
+        """Get the journal entries as they were at a backup"""
+        with self.lock:
+            records = self.list_backups()
+            order, objects, _ = self.replay(records, self.find(records, backup_id))
+        try:
+            return [objects[digest] for digest in order]
+        except KeyError:
+            raise ValueError(f"Backup #{backup_id} is missing entry data")
+
+    def squash(self, backup_id):
+        """Fold every backup up to backup_id into a new base at backup_id
+
+        Earlier points in time are no longer restorable afterwards. Returns
+        the number of backups removed.
+        """
+        with self.lock:
+            records = self.list_backups()
+            index = self.find(records, backup_id)
+            if index == 0 and records[0]['kind'] == 'base':
+                return 0
+            order, objects, _ = self.replay(records, index)
+
+            # Later deltas in this chain may re-add content whose body was only in a dropped file
+            keep = set(order)
+            for record in records[index + 1:]:
+                if record['kind'] == 'base':
+                    break
+                data = self.read_backup(record)
+                keep.update(digest for digest in data['added'] if digest not in data['objects'])
+
+            filename = f"{backup_id:06d}_base.json.gz"
+            self.write_backup(filename, {
+                'kind': 'base',
+                'order': order,
+                'objects': {digest: objects[digest] for digest in keep if digest in objects},
+            })
+            dropped = [record['file'] for record in records[:index + 1] if record['file'] != filename]
+            squashed = dict(records[index], kind='base', file=filename)
+            records = [squashed] + records[index + 1:]
+            self.save_manifest(records)
+            # Known hashes may have shrunk; rebuild on the next backup
+            self.head = None
+
+        # Removed only once the manifest no longer refers to them
+        for name in dropped:
+            try:
+                os.remove(self.path(name))
+            except FileNotFoundError:
+                pass
+        return index
+
+    def prune(self, keep):
+        """Keep only the newest keep backups, squashing the oldest of them into a base"""
+        records = self.list_backups()
+        if keep < 1 or len(records) <= keep:
+            return 0
+        return self.squash(records[-keep]['id'])
@@ -0,0 +1,216 @@
+"""
+Optional NumPy column store for vectorized entry filtering and aggregation
+"""
+from datetime import date
+from Configuration.settings import AppConfig
+
+# Imported by load_numpy on first use, so startup doesn't pay for NumPy when the store is off
+np = None
+
+def load_numpy():
+    """Import NumPy into this module, returning whether it is installed"""
+    global np
+    if np is None:
+        try:
+            import numpy
+        except ImportError:
+            return False
+        np = numpy
+    return True
+
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+INVALID_DATE = 0  # Real ordinals start at 1
+
+class ColumnarEntryStore:
+    """Entry columns kept row-aligned with DataManager.data
+
+    Dates are int32 ordinals, moods are int8 codes into a mood dictionary, and
+    notes live in one UTF-8 blob addressed by per-row start/end offsets.
+    Deleting a row leaves its note bytes in the blob until the next rebuild.
+    """
+
+    def __init__(self, entries=()):
+        self.rebuild(entries)
+
+    @staticmethod
+    def available():
+        """Whether NumPy is installed (importing it if so)"""
+        return load_numpy()
+
+    def rebuild(self, entries):
+        """Rebuild every column from a list of entries"""
+        load_numpy()
+        self.moods = []
+        self.mood_codes = {}
+        self.invalid_dates = 0
+        self.count = len(entries)
+        capacity = max(self.count, AppConfig.COLUMNAR_MIN_CAPACITY)
+
+        self.date_ordinals = np.zeros(capacity, dtype=np.int32)
+        self.mood_column = np.zeros(capacity, dtype=np.int8)
+        self.note_starts = np.zeros(capacity, dtype=np.int64)
+        self.note_ends = np.zeros(capacity, dtype=np.int64)
+        self.notes_blob = bytearray()
+
+        if not entries:
+            return
+
+        # Parse all dates in one C-level pass; fall back per entry only if some are malformed
+        dates = [entry['date'] for entry in entries]
+        try:
+            days = np.array(dates, dtype='datetime64[D]').astype(np.int64)
+            self.date_ordinals[:self.count] = days + EPOCH_ORDINAL
+        except ValueError:
+            self.date_ordinals[:self.count] = [self.to_ordinal(d) for d in dates]
+        self.invalid_dates = int(np.count_nonzero(self.date_ordinals[:self.count] == INVALID_DATE))
+
+        self.mood_column[:self.count] = [self.get_mood_code(entry['mood']) for entry in entries]
+
+        for row, entry in enumerate(entries):
+            self.write_notes(row, entry.get('notes', ''))
+
+    @staticmethod
+    def to_ordinal(date_str):
+        """Convert a YYYY-MM-DD string to a date ordinal, or INVALID_DATE"""
+        try:
+            return np.datetime64(date_str, 'D').astype(np.int64) + EPOCH_ORDINAL
+        except ValueError:
+            return INVALID_DATE
+
+    def get_mood_code(self, mood):
+        """Get (or assign) the categorical code for a mood"""
+        code = self.mood_codes.get(mood)
+        if code is None:
+            code = len(self.moods)
+            if code > np.iinfo(self.mood_column.dtype).max:
+                # More custom moods than int8 can hold
+                self.mood_column = self.mood_column.astype(np.int16)
+            self.moods.append(mood)
+            self.mood_codes[mood] = code
+        return code
+
+    def write_notes(self, row, notes):
+        """Append a row's notes to the blob and record their offsets"""
+        start = len(self.notes_blob)
+        self.notes_blob += notes.encode('utf-8')
+        self.note_starts[row] = start
+        self.note_ends[row] = len(self.notes_blob)
+
+    def get_notes(self, row):
+        """Decode the notes for a row"""
+        return self.notes_blob[self.note_starts[row]:self.note_ends[row]].decode('utf-8')
+
+    def ensure_capacity(self, size):
+        """Grow the columns geometrically so appends stay amortized O(1)"""
+        if size <= len(self.date_ordinals):
+            return
+        capacity = max(size, len(self.date_ordinals) * 2)
+        for name in ('date_ordinals', 'mood_column', 'note_starts', 'note_ends'):
+            column = getattr(self, name)
+            grown = np.zeros(capacity, dtype=column.dtype)
+            grown[:self.count] = column[:self.count]
+            setattr(self, name, grown)
+
+    def insert(self, row, entry):
+        """Insert an entry's values at a row, shifting later rows down"""
+        self.ensure_capacity(self.count + 1)
+        for column in (self.date_ordinals, self.mood_column, self.note_starts, self.note_ends):
+            column[row + 1:self.count + 1] = column[row:self.count]
+        self.count += 1
+
+        ordinal = self.to_ordinal(entry['date'])
+        if ordinal == INVALID_DATE:
+            self.invalid_dates += 1
+        self.date_ordinals[row] = ordinal
+        code = self.get_mood_code(entry['mood'])
+        self.mood_column[row] = code
+        self.write_notes(row, entry.get('notes', ''))
+
+    def append(self, entry):
+        """Append an entry as the last row"""
+        self.insert(self.count, entry)
+
+    def delete(self, row):
+        """Remove a row, shifting later rows up"""
+        if self.date_ordinals[row] == INVALID_DATE:
+            self.invalid_dates -= 1
+        for column in (self.date_ordinals, self.mood_column, self.note_starts, self.note_ends):
+            column[row:self.count - 1] = column[row + 1:self.count]
+        self.count -= 1
+
+    def can_filter(self, filters):
+        """Whether filters can be answered exactly by the vectorized path"""
+        if self.invalid_dates:
+            # String comparisons on malformed dates can't be reproduced with ordinals
+            return False
+        for key in ('start_date', 'end_date'):
+            if filters.get(key) and self.to_ordinal(filters[key]) == INVALID_DATE:
+                return False
+        return True
+
+    def filter_rows(self, start_date=None, end_date=None, mood=None):
+        """Get matching row numbers in date order (ties keep insertion order)"""
+        ordinals = self.date_ordinals[:self.count]
+        mask = np.ones(self.count, dtype=bool)
+        if start_date:
+            mask &= ordinals >= self.to_ordinal(start_date)
+        if end_date:
+            mask &= ordinals <= self.to_ordinal(end_date)
+        if mood:
+            code = self.mood_codes.get(mood)
+            if code is None:
+                return np.zeros(0, dtype=np.int64)
+            mask &= self.mood_column[:self.count] == code
+
+        rows = np.flatnonzero(mask)
+        return rows[np.argsort(ordinals[rows], kind='stable')]
+
+    def mood_counts(self):
+        """Count rows per mood"""
+        counts = np.bincount(self.mood_column[:self.count], minlength=len(self.moods))
+        return {self.moods[code]: int(n) for code, n in enumerate(counts) if n}
+
+    def period_counts(self, period_keys, format_key):
+        """Count moods per period given an integer period key for each valid-date row"""
+        if not len(period_keys):
+            return {}
+        valid = self.date_ordinals[:self.count] != INVALID_DATE
+        codes = self.mood_column[:self.count][valid].astype(np.int64)
+        keys, counts = np.unique(period_keys * len(self.moods) + codes, return_counts=True)
+
+        # Only the distinct periods are formatted as strings, in Python
+        result = {}
+        for key, n in zip(keys.tolist(), counts.tolist()):
+            period, code = divmod(key, len(self.moods))
+            result.setdefault(format_key(period), {})[self.moods[code]] = n
+        return result
+
+    def valid_days(self):
+        """Days since the epoch for every row with a parseable date"""
+        ordinals = self.date_ordinals[:self.count]
+        return (ordinals[ordinals != INVALID_DATE] - EPOCH_ORDINAL).astype('datetime64[D]')
+
+    def monthly_counts(self):
+        """Count moods per YYYY-MM month"""
+        months = self.valid_days().astype('datetime64[M]').astype(np.int64)
+        return self.period_counts(months, lambda month: str(np.datetime64(month, 'M')))
+
+    def weekly_counts(self):
+        """Count moods per ISO week, keyed like YYYY-Www"""
+        days = self.valid_days()
+        # The ISO year and week are those of the Thursday in the same Monday-based week
+        weekday = (days.astype(np.int64) - 4) % 7  # 1970-01-01 was a Thursday
+        thursdays = days - weekday + 3
+        year_starts = thursdays.astype('datetime64[Y]')
+        weeks = (thursdays - year_starts.astype('datetime64[D]')).astype(np.int64) // 7 + 1
+        years = year_starts.astype(np.int64) + 1970
+        return self.period_counts(years * 100 + weeks, lambda key: f"{key // 100}-W{key % 100:02d}")
+
+    def timeline(self):
+        """Get (row order by date, compact mood values, mood labels) for the timeline chart"""
+        order = np.argsort(self.date_ordinals[:self.count], kind='stable')
+        codes = self.mood_column[:self.count][order]
+        used = np.unique(codes)
+        remap = np.zeros(len(self.moods), dtype=np.int64)
+        remap[used] = np.arange(len(used))
+        return order, remap[codes], [self.moods[code] for code in used.tolist()]
@@ -3,118 +3,662 @@ Data management module for handling journal entries
 """
 import json
 import os
-from datetime import datetime
-from tkinter import messagebox
+import sqlite3
+import sys
+import threading
+import uuid
+from Configuration.settings import AppConfig
+from modules.aggregates import MoodAggregates
+from modules.backup_store import BackupStore
+from modules.columnar_store import ColumnarEntryStore
+from modules.entry import Entry
+from modules.entry_index import EntryIndex, PositionMap
+from modules.journal_reader import JournalReader
+from modules.text_index import NoteTextIndex
+from modules.storage import JsonFileStorage, create_storage, validate_entries, write_json_atomic
+from utils.instrumentation import instrumented
+from utils.validators import Validators
+
+def print_error(title, message, warning=False):
+    """Default error handler: report on stderr, for use without a GUI"""
+    print(f"{'Warning' if warning else 'Error'}: {title}: {message}", file=sys.stderr)
 
 class DataManager:
     """Handles all data operations for the mood journal"""
     
-    def __init__(self, filename="journal.json"):
+    def __init__(self, filename="journal.json", append_only=None, backend=None, error_handler=None,
+                 read_only=False):
         self.filename = filename
+        # Called as error_handler(title, message, warning=False); the GUI passes one that shows dialogs
+        self.error_handler = error_handler or print_error
+        # Read-only managers (report_cli) load the journal without creating, migrating or rewriting it
+        self.read_only = read_only
+        # Held by every read and write of the entries and indexes: edits run on the
+        # background worker while the Tk thread deletes, clears and reads
+        self.lock = threading.RLock()
+        self.storage = create_storage(filename, backend, append_only, read_only)
         self.data = []
+        self.index = EntryIndex()
+        self.positions = PositionMap()
+        self.aggregates = MoodAggregates()
+        self.text_index = NoteTextIndex()
+        self.columns = None
+        if AppConfig.COLUMNAR_STORE and ColumnarEntryStore.available():
+            self.columns = ColumnarEntryStore()
+        self.listeners = []
+        self.pending_deletes = set()
+        # Adds and deletes made while load_history builds the merged indexes, replayed by merge_history
+        self.history_edits = None
+        stem = os.path.splitext(os.path.abspath(filename))[0]
+        self.backup_store = BackupStore(stem + AppConfig.BACKUP_DIR_SUFFIX)
         self.initialize_data_file()
         self.load_data()
     
     def initialize_data_file(self):
         """Initialize the data file if it doesn't exist"""
-        if not os.path.exists(self.filename):
-            with open(self.filename, 'w') as file:
-                json.dump([], file)
+        self.storage.initialize()
     
+    @instrumented
     def load_data(self):
-        """Load journal data from file with error handling"""
-        try:
-            with open(self.filename, 'r') as file:
-                self.data = json.load(file)
-                # Validate data structure
-                for entry in self.data:
-                    if 'date' not in entry or 'mood' not in entry:
-                        raise ValueError("Invalid data structure in journal file")
-        except (FileNotFoundError, json.JSONDecodeError, ValueError) as e:
-            messagebox.showwarning("Data Error", 
-                                 f"Could not load journal data. Starting with empty journal.\nError: {str(e)}")
-            self.data = []
-            # Recreate the file with empty data
-            with open(self.filename, 'w') as file:
-                json.dump(self.data, file)
-        except Exception as e:
-            messagebox.showerror("Error", f"Unexpected error loading data: {str(e)}")
-            self.data = []
+        """Load journal data from file with error handling
+        
+        Large journals may load progressively: only the newest entries are read
+        here and history_pending is set; load_history and merge_history then
+        bring in the rest without blocking the window.
+        """
+        with self.lock:
+            self.discard_history()
+            try:
+                loaded = None
+                if AppConfig.LOAD_PROGRESSIVE:
+                    loaded = self.storage.load_recent(AppConfig.LOAD_RECENT_ENTRIES)
+                if loaded is not None:
+                    self.data, self.pending_deletes = loaded
+                else:
+                    self.data = self.storage.load()
+            except (FileNotFoundError, json.JSONDecodeError, ValueError, sqlite3.DatabaseError) as e:
+                self.error_handler("Data Error",
+                                   f"Could not load journal data. Starting with empty journal.\nError: {str(e)}",
+                                   warning=True)
+                self.data = []
+                # Recreate the storage with empty data
+                if not self.read_only:
+                    self.storage.reset()
+            except Exception as e:
+                self.error_handler("Error", f"Unexpected error loading data: {str(e)}")
+                self.data = []
+        
+            # Legacy journals have no ids; persist the backfilled ones so log records can refer to them
+            if self.assign_entry_ids(self.data) and not self.read_only:
+                self.save_data()
+        
+            self.rebuild_indexes()
+            self.notify("replaced")
+    
+    @property
+    def history_pending(self):
+        """Whether older entries are still to be loaded after a progressive load"""
+        return self.storage.history_pending
+    
+    def load_history(self):
+        """Read the older entries deferred by a progressive load and index them (runs on the background worker)
+        
+        The merged journal and its indexes are built here, off the Tk thread;
+        merge_history only swaps them in. Returns None if there is nothing to merge.
+        """
+        history = self.storage.load_history()
+        with self.lock:
+            if not self.history_pending:
+                return None
+            recent = list(self.data)
+            pending_deletes = self.pending_deletes
+            self.history_edits = []
+        
+        history = [entry for entry in history if entry.get('id') not in pending_deletes]
+        assigned = self.assign_entry_ids(history)
+        merged = history + recent
+        indexes = self.build_indexes(merged)
+        return {'data': merged, 'indexes': indexes, 'assigned': assigned}
+    
+    def merge_history(self, merged):
+        """Swap in the journal built by load_history (call on the Tk thread)"""
+        with self.lock:
+            if merged is None or not self.history_pending or self.history_edits is None:
+                # The journal was cleared or replaced while the history was loading
+                return False
+        
+            edits = self.history_edits
+            self.history_edits = None
+            self.pending_deletes = set()
+            self.data = merged['data']
+            self.install_indexes(merged['indexes'])
+            # Entries added or deleted since load_history took its snapshot
+            for op, entry in edits:
+                if op == 'add':
+                    self.attach(entry)
+                else:
+                    self.detach(entry['id'])
+            self.storage.finish_history(self.data)
+            if merged['assigned']:
+                self.save_data()
+        
+            self.notify("replaced")
+            return True
+    
+    def check_history_loaded(self):
+        """Raise ValueError while older entries are still loading
+        
+        For operations that would silently work on a partial journal, such as
+        backups, reports, exports and duplicate-checked imports.
+        """
+        if self.history_pending:
+            raise ValueError("Older entries are still loading; try again in a moment")
+    
+    def discard_history(self):
+        """Drop any still-unloaded history because the journal is being replaced"""
+        with self.lock:
+            self.pending_deletes = set()
+            self.history_edits = None
+            if self.history_pending:
+                self.storage.finish_history()
+    
+    @staticmethod
+    def new_entry_id():
+        """Generate a stable unique entry id"""
+        return uuid.uuid4().hex
+    
+    @classmethod
+    def assign_entry_ids(cls, entries):
+        """Give every entry without an id a new one, returning how many were assigned"""
+        assigned = 0
+        for entry in entries:
+            if not entry.get('id'):
+                entry['id'] = cls.new_entry_id()
+                assigned += 1
+        return assigned
+    
+    def rebuild_indexes(self):
+        """Rebuild all in-memory indexes from self.data"""
+        self.install_indexes(self.build_indexes(self.data))
+    
+    def build_indexes(self, entries):
+        """Build a fresh set of in-memory indexes over entries without touching the current ones"""
+        indexes = {
+            'index': EntryIndex(entries),
+            'positions': PositionMap(entries),
+            # The notes index is built by the next text search
+            'text_index': NoteTextIndex(),
+            'columns': None,
+        }
+        if self.columns is not None:
+            columns = ColumnarEntryStore(entries)
+            # Seed the running aggregates from vectorized counts instead of a per-entry pass
+            aggregates = MoodAggregates()
+            aggregates.load_counts(columns.mood_counts(), columns.weekly_counts(), columns.monthly_counts())
+            indexes['columns'] = columns
+            indexes['aggregates'] = aggregates
+        else:
+            indexes['aggregates'] = MoodAggregates(entries)
+        return indexes
+    
+    def install_indexes(self, indexes):
+        """Make indexes from build_indexes the current ones"""
+        self.index = indexes['index']
+        self.positions = indexes['positions']
+        self.text_index = indexes['text_index']
+        self.aggregates = indexes['aggregates']
+        self.columns = indexes['columns']
     
+    def attach(self, entry):
+        """Append an entry to the list and every in-memory index"""
+        self.data.append(entry)
+        self.index.add(entry)
+        self.positions.append(entry)
+        self.aggregates.add(entry)
+        self.text_index.add(entry)
+        if self.columns is not None:
+            self.columns.append(entry)
+    
+    def detach(self, entry_id):
+        """Remove an entry from the list and every in-memory index
+        
+        Returns (position, entry, sequence) for undoing the removal, or None if
+        there is no such entry.
+        """
+        position = self.positions.lookup(entry_id, self.data)
+        if position is None:
+            return None
+        entry = self.data.pop(position)
+        self.index.remove(entry)
+        sequence = self.positions.discard(entry_id)
+        self.aggregates.remove(entry)
+        self.text_index.remove(entry)
+        if self.columns is not None:
+            self.columns.delete(position)
+        return position, entry, sequence
+    
+    def subscribe(self, callback):
+        """Register callback(event, entry) for change events
+        
+        Events are "inserted" and "deleted" with the affected entry, and
+        "replaced" and "cleared" (entry is None) when the whole journal changes.
+        """
+        if callback not in self.listeners:
+            self.listeners.append(callback)
+    
+    def unsubscribe(self, callback):
+        """Remove a previously registered change callback"""
+        if callback in self.listeners:
+            self.listeners.remove(callback)
+    
+    def notify(self, event, entry=None):
+        """Publish a change event to all subscribers"""
+        for callback in list(self.listeners):
+            callback(event, entry)
+    
+    @staticmethod
+    def entry_matches(entry, filters):
+        """Check a single entry against get_entries-style filters"""
+        if not filters:
+            return True
+        if filters.get('start_date') and entry['date'] < filters['start_date']:
+            return False
+        if filters.get('end_date') and entry['date'] > filters['end_date']:
+            return False
+        if filters.get('mood') and filters['mood'] != 'All' and entry['mood'] != filters['mood']:
+            return False
+        if filters.get('text', '').strip() and not NoteTextIndex.matches(entry.get('notes', ''), filters['text']):
+            return False
+        return True
+    
+    @instrumented
     def save_data(self):
         """Save journal data to file with error handling"""
+        with self.lock:
+            try:
+                self.storage.save(self.data)
+                return True
+            except Exception as e:
+                self.error_handler("Save Error", f"Could not save data: {str(e)}")
+                return False
+    
+    def flush_data(self):
+        """Force any coalesced writes to disk (call before exiting)"""
+        with self.lock:
+            try:
+                self.storage.flush()
+                return True
+            except Exception as e:
+                self.error_handler("Save Error", f"Could not save data: {str(e)}")
+                return False
+    
+    def close(self):
+        """Flush pending writes and release the storage backend"""
+        with self.lock:
+            try:
+                self.storage.close()
+                return True
+            except Exception as e:
+                self.error_handler("Save Error", f"Could not save data: {str(e)}")
+                return False
+    
+    def compact_data(self):
+        """Compact the underlying storage"""
+        def compact(data):
+            try:
+                self.storage.compact(data)
+                return True
+            except Exception as e:
+                self.error_handler("Save Error", f"Could not compact data: {str(e)}")
+                return False
+        return self.update_then_write(lambda: self.data, compact)
+    
+    def update_then_write(self, update, write):
+        """Run update() under self.lock, then write(its result) holding only the storage lock
+        
+        The storage lock is taken before self.lock is released, so writes still
+        reach the storage in the same order as the in-memory changes, but
+        readers on the Tk thread don't wait for a long snapshot write.
+        """
+        with self.lock:
+            result = update()
+            self.storage.lock.acquire()
         try:
-            with open(self.filename, 'w') as file:
-                json.dump(self.data, file, indent=4)
-            return True
-        except Exception as e:
-            messagebox.showerror("Save Error", f"Could not save data: {str(e)}")
-            return False
+            return write(result)
+        finally:
+            self.storage.lock.release()
     
+    @instrumented
     def add_entry(self, entry):
-        """Add a new journal entry"""
-        self.data.append(entry)
-        return self.save_data()
+        """Add a new journal entry (an Entry, or a dict which is converted)"""
+        with self.lock:
+            entry = Entry.from_dict(entry)
+            if not entry.get('id'):
+                entry['id'] = self.new_entry_id()
+        
+            self.attach(entry)
+            try:
+                self.storage.add(self.data, entry)
+            except Exception as e:
+                self.error_handler("Save Error", f"Could not save data: {str(e)}")
+                # Roll back so memory matches what is on disk
+                self.detach(entry['id'])
+                return False
+        
+            if self.history_edits is not None:
+                self.history_edits.append(('add', entry))
+            self.notify("inserted", entry)
+            return True
+    
+    @staticmethod
+    def dedupe_key(entry):
+        """Key under which two entries count as duplicates for imports"""
+        return (entry['date'], entry['mood'], entry.get('notes', ''))
+    
+    def import_entries(self, rows, allowed_moods, dedupe=False, progress=None):
+        """Validate and add many entries, persisting them with a single write
+        
+        rows yields (line number, entry) pairs, with entry None for rows that
+        couldn't be parsed (see EntryImporter). Bad rows are skipped and reported.
+        progress(rows_read) is called after each batch and may raise to abort.
+        Returns a summary dict with imported, invalid and duplicate counts.
+        """
+        result = {'imported': 0, 'invalid': 0, 'duplicates': 0, 'errors': []}
+        self.check_history_loaded()
+        with self.lock:
+            seen = {self.dedupe_key(entry) for entry in self.data} if dedupe else None
+        accepted = []
+        batch = []
+        
+        def reject(line_number, message):
+            result['invalid'] += 1
+            if len(result['errors']) < AppConfig.IMPORT_MAX_ERRORS:
+                result['errors'].append((line_number, message))
+        
+        def validate_batch():
+            for line_number, entry in batch:
+                if entry is None:
+                    reject(line_number, "Unreadable row")
+                    continue
+                if not isinstance(entry.get('date'), str) or not isinstance(entry.get('mood'), str):
+                    reject(line_number, "Missing date or mood")
+                    continue
+                valid, message = Validators.validate_entry_data(entry, allowed_moods)
+                if not valid:
+                    reject(line_number, message)
+                    continue
+                
+                entry['mood'] = entry['mood'].strip()
+                entry = Entry.from_dict(entry)
+                if dedupe:
+                    key = self.dedupe_key(entry)
+                    if key in seen:
+                        result['duplicates'] += 1
+                        continue
+                    seen.add(key)
+                accepted.append(entry)
+            batch.clear()
+        
+        rows_read = 0
+        for row in rows:
+            batch.append(row)
+            rows_read += 1
+            if len(batch) >= AppConfig.IMPORT_BATCH_SIZE:
+                validate_batch()
+                if progress:
+                    progress(rows_read)
+        validate_batch()
+        
+        if not accepted:
+            return result
+        
+        def add_to_memory():
+            # Imported ids must not collide with existing ones or each other
+            existing_ids = set(self.positions.entries)
+            for entry in accepted:
+                if not entry.get('id') or entry['id'] in existing_ids:
+                    entry['id'] = self.new_entry_id()
+                existing_ids.add(entry['id'])
+            self.data.extend(accepted)
+            self.rebuild_indexes()
+            return self.data
+        
+        try:
+            self.update_then_write(add_to_memory, lambda data: self.storage.add_many(data, accepted))
+        except Exception:
+            # Roll back so memory matches what is on disk
+            with self.lock:
+                imported_ids = {entry['id'] for entry in accepted}
+                self.data = [entry for entry in self.data if entry['id'] not in imported_ids]
+                self.rebuild_indexes()
+            raise
+        
+        result['imported'] = len(accepted)
+        self.notify("replaced")
+        return result
+    
+    def get_entry(self, entry_id):
+        """Look up an entry by id"""
+        with self.lock:
+            return self.positions.get(entry_id)
     
     def delete_entry(self, index):
         """Delete an entry by index"""
-        if 0 <= index < len(self.data):
-            deleted_entry = self.data.pop(index)
-            if self.save_data():
-                return deleted_entry
-            else:
+        with self.lock:
+            if 0 <= index < len(self.data):
+                return self.delete_entry_by_id(self.data[index]['id'])
+            return None
+    
+    @instrumented
+    def delete_entry_by_id(self, entry_id):
+        """Delete an entry by its id"""
+        with self.lock:
+            detached = self.detach(entry_id)
+            if detached is None:
+                return None
+        
+            index, deleted_entry, sequence = detached
+            try:
+                self.storage.delete(self.data, index, deleted_entry)
+            except Exception as e:
+                self.error_handler("Save Error", f"Could not save data: {str(e)}")
                 # Restore if save failed
                 self.data.insert(index, deleted_entry)
-        return None
+                self.index.add(deleted_entry)
+                self.positions.restore(deleted_entry, sequence)
+                self.aggregates.add(deleted_entry)
+                self.text_index.add(deleted_entry)
+                if self.columns is not None:
+                    self.columns.insert(index, deleted_entry)
+                return None
+        
+            if self.history_edits is not None:
+                self.history_edits.append(('delete', deleted_entry))
+            self.notify("deleted", deleted_entry)
+            return deleted_entry
     
     def get_entries(self, filters=None):
         """Get entries with optional filtering"""
-        if not filters:
-            return self.data.copy()
+        with self.lock:
+            if not filters:
+                return self.data.copy()
+        
+            mood = filters.get('mood')
+            if mood == 'All':
+                mood = None
+        
+            text = filters.get('text', '').strip()
+            if text and not self.storage.supports_query:
+                # Start from the (usually small) set of notes matches and apply date/mood to those
+                return self.search_entries(text, filters)
+        
+            if self.storage.supports_query:
+                # Push the filter down into the storage engine
+                entries = self.storage.query(filters.get('start_date'), filters.get('end_date'), mood)
+                if text:
+                    ids = self.text_index.search(text, self.data)
+                    entries = [entry for entry in entries if entry['id'] in ids]
+                return entries
+        
+            if self.columns is not None and self.columns.can_filter(filters):
+                # Vectorized mask over the date and mood columns
+                rows = self.columns.filter_rows(filters.get('start_date'), filters.get('end_date'), mood)
+                return [self.data[row] for row in rows.tolist()]
         
-        filtered_data = self.data.copy()
+            # Date range and mood are both answered by the sorted indexes
+            return self.index.query(filters.get('start_date'), filters.get('end_date'), mood)
+    
+    def search_entries(self, text, filters=None):
+        """Get entries whose notes match text, narrowed by any date/mood filters, in date order"""
+        with self.lock:
+            ids = self.text_index.search(text, self.data)
+            entries = [self.positions.get(entry_id) for entry_id in sorted(ids, key=self.positions.sequence_of)]
+            # Stable sort keeps same-day entries in insertion order, like the date index
+            entries.sort(key=lambda entry: entry['date'])
+            if filters:
+                # The text part is already satisfied; only date and mood remain to check
+                filters = {key: value for key, value in filters.items() if key != 'text'}
+            return [entry for entry in entries if self.entry_matches(entry, filters)]
+    
+    def iter_entries(self, filters=None):
+        """Yield the entries get_entries would return, one at a time
+        
+        Entries are read AppConfig.EXPORT_PAGE_SIZE at a time under the lock
+        and yielded after releasing it, so an export neither copies the
+        matches nor blocks the Tk thread. Entries added or deleted while it
+        runs may or may not be included.
+        """
+        self.check_history_loaded()
+        if not filters:
+            # Journal order, like get_entries
+            return self.iter_pages(lambda after, limit: self.positions.page(self.data, after, limit))
         
-        # Apply date range filter
-        if filters.get('start_date'):
-            filtered_data = [e for e in filtered_data if e['date'] >= filters['start_date']]
-        if filters.get('end_date'):
-            filtered_data = [e for e in filtered_data if e['date'] <= filters['end_date']]
+        start_date, end_date = filters.get('start_date'), filters.get('end_date')
+        mood = filters.get('mood')
+        if mood == 'All':
+            mood = None
         
-        # Apply mood filter
-        if filters.get('mood') and filters['mood'] != 'All':
-            filtered_data = [e for e in filtered_data if e['mood'] == filters['mood']]
+        ids = None
+        text = filters.get('text', '').strip()
+        if text:
+            with self.lock:
+                ids = self.text_index.search(text, self.data)
         
-        return filtered_data
+        if self.storage.supports_query:
+            read_page = lambda after, limit: self.storage.query_page(start_date, end_date, mood, after, limit)
+        else:
+            read_page = lambda after, limit: self.index.page(start_date, end_date, mood, after, limit)
+        return self.iter_pages(read_page, ids)
+    
+    def iter_pages(self, read_page, ids=None):
+        """Yield entries from read_page(after, limit) page by page, keeping only ids if given"""
+        after = None
+        while True:
+            with self.lock:
+                # Indexes may be replaced between pages, so read_page looks them up each time
+                entries, after = read_page(after, AppConfig.EXPORT_PAGE_SIZE)
+            if not entries:
+                return
+            for entry in entries:
+                if ids is None or entry['id'] in ids:
+                    yield entry
     
     def clear_all_data(self):
         """Clear all journal data"""
-        self.data = []
-        return self.save_data()
+        with self.lock:
+            self.discard_history()
+            self.data = []
+            self.rebuild_indexes()
+            if not self.save_data():
+                return False
+        
+            self.notify("cleared")
+            return True
     
     def backup_data(self, backup_filename=None):
-        """Create a backup of the data file"""
-        if not backup_filename:
-            backup_filename = f"journal_backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+        """Back up the journal, returning a description of the backup
         
+        Without a filename the backup goes to the incremental backup store and
+        only the entries changed since the previous backup are written. With a
+        filename a full standalone snapshot is written there instead.
+        """
         try:
-            with open(self.filename, 'r') as source, open(backup_filename, 'w') as target:
-                target.write(source.read())
-            return backup_filename
+            self.check_history_loaded()
+            with self.lock:
+                entries = list(self.data)
+            if backup_filename:
+                # Write a clean snapshot so the backup includes any un-compacted log records
+                write_json_atomic(backup_filename, entries)
+                return backup_filename
+            record, created = self.backup_store.create(entries)
+            if not created:
+                return f"#{record['id']} (no changes since then)"
+            return f"#{record['id']} ({record['timestamp']})"
         except Exception as e:
             raise Exception(f"Failed to create backup: {str(e)}")
     
+    def list_backups(self):
+        """Backups in the incremental store, oldest first"""
+        return self.backup_store.list_backups()
+    
+    def restore_backup(self, backup_id):
+        """Restore the journal as it was at an incremental backup"""
+        try:
+            backup_data = self.backup_store.reconstruct(backup_id)
+        except Exception as e:
+            raise Exception(f"Failed to restore data: {str(e)}")
+        return self.replace_entries(backup_data)
+    
+    def squash_backups(self, backup_id):
+        """Fold all backups up to backup_id into one, returning how many were removed"""
+        return self.backup_store.squash(backup_id)
+    
+    def prune_backups(self, keep):
+        """Keep only the newest keep backups, returning how many were removed"""
+        return self.backup_store.prune(keep)
+    
     def restore_data(self, backup_filename):
         """Restore data from a backup file"""
         try:
-            with open(backup_filename, 'r') as file:
-                backup_data = json.load(file)
-            
+            if backup_filename.endswith(AppConfig.LOG_EXTENSION):
+                # A bare journal log is replayed onto an empty journal
+                backup_data = []
+                JsonFileStorage.replay_log(backup_filename, backup_data)
+            else:
+                # Plain or compressed snapshots, whichever layout they were written in
+                with JournalReader(backup_filename) as reader:
+                    backup_data = list(reader.iter_entries())
+        except Exception as e:
+            raise Exception(f"Failed to restore data: {str(e)}")
+        return self.replace_entries(backup_data)
+    
+    def replace_entries(self, backup_data):
+        """Replace the whole journal with restored entries"""
+        try:
             # Validate backup data structure
-            for entry in backup_data:
-                if 'date' not in entry or 'mood' not in entry:
-                    raise ValueError("Invalid backup file structure")
-            
-            self.data = backup_data
-            return self.save_data()
+            validate_entries(backup_data, "Invalid backup file structure")
+            backup_data = [Entry.from_dict(entry) for entry in backup_data]
+            self.assign_entry_ids(backup_data)
+            # Indexed before taking the lock; only the swap itself holds it
+            indexes = self.build_indexes(backup_data)
         except Exception as e:
-            raise Exception(f"Failed to restore data: {str(e)}")
\ No newline at end of file
+            raise Exception(f"Failed to restore data: {str(e)}")
+        
+        def swap():
+            self.discard_history()
+            self.data = backup_data
+            self.install_indexes(indexes)
+            return self.data
+        
+        def save(data):
+            try:
+                self.storage.save(data)
+                return True
+            except Exception as e:
+                self.error_handler("Save Error", f"Could not save data: {str(e)}")
+                return False
+        
+        saved = self.update_then_write(swap, save)
+        if saved:
+            self.notify("replaced")
+        return saved
\ No newline at end of file
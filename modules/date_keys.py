@@ -0,0 +1,22 @@
+"""
+Dates parsed once into ordinals and report period keys
+"""
+from collections import namedtuple
+from functools import lru_cache
+from Configuration.settings import AppConfig
+from utils.validators import Validators
+
+DateKeys = namedtuple('DateKeys', ['ordinal', 'week_key', 'month_key'])
+
+@lru_cache(maxsize=AppConfig.DATE_KEY_CACHE_SIZE)
+def get_date_keys(date_str):
+    """Get the (ordinal, "YYYY-Www", "YYYY-MM") keys for a date string, or None if it doesn't parse
+
+    Journals have far fewer distinct dates than entries, so results are cached per
+    date string; every entry on the same day shares one parse.
+    """
+    date = Validators.parse_date(date_str)
+    if date is None:
+        return None
+    year, week, _ = date.isocalendar()
+    return DateKeys(date.toordinal(), f"{year}-W{week:02d}", date.strftime("%Y-%m"))
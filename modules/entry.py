@@ -0,0 +1,113 @@
+"""
+Compact journal entry type
+"""
+import sys
+from Configuration.settings import AppConfig
+
+# Every entry with the same mood shares one string object
+MOOD_TABLE = {mood: mood for mood in AppConfig.DEFAULT_MOODS}
+
+def intern_mood(mood):
+    """Get the shared string for a mood, registering it if it is new"""
+    return MOOD_TABLE.setdefault(mood, mood)
+
+def register_moods(moods):
+    """Register custom moods so entries using them share strings"""
+    for mood in moods:
+        intern_mood(mood)
+
+class Entry:
+    """A journal entry stored in slots instead of a per-entry dict
+
+    Entries also support the dict-style access (entry['date'], entry.get,
+    'notes' in entry) the rest of the code was written against. Fields other
+    than the known ones are kept in a small extra dict, created only when
+    needed. Convert with from_dict / to_dict at the JSON boundary.
+    """
+
+    __slots__ = ('id', 'date', 'mood', 'notes', 'sentiment_score', 'extra')
+
+    FIELDS = ('date', 'mood', 'notes', 'id', 'sentiment_score')
+
+    def __init__(self, date, mood, notes="", id=None, sentiment_score=None, extra=None):
+        self.id = id
+        # Dates repeat across entries written on the same day
+        self.date = sys.intern(date) if type(date) is str else date
+        self.mood = intern_mood(mood)
+        self.notes = notes
+        self.sentiment_score = sentiment_score
+        self.extra = extra or None
+
+    @classmethod
+    def from_dict(cls, data):
+        """Build an entry from a JSON object (an Entry is returned unchanged)"""
+        if isinstance(data, Entry):
+            return data
+        extra = {key: value for key, value in data.items() if key not in cls.FIELDS}
+        return cls(data['date'], data['mood'], data.get('notes', ''), data.get('id'),
+                   data.get('sentiment_score'), extra)
+
+    def to_dict(self):
+        """Convert back to the JSON object stored on disk"""
+        data = {"date": self.date, "mood": self.mood, "notes": self.notes}
+        if self.id is not None:
+            data['id'] = self.id
+        if self.sentiment_score is not None:
+            data['sentiment_score'] = self.sentiment_score
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+    def __getitem__(self, key):
+        if key in Entry.FIELDS:
+            value = getattr(self, key)
+            if value is None and key in ('id', 'sentiment_score'):
+                raise KeyError(key)
+            return value
+        if self.extra and key in self.extra:
+            return self.extra[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key == 'mood':
+            value = intern_mood(value)
+        if key in Entry.FIELDS:
+            setattr(self, key, value)
+        else:
+            if self.extra is None:
+                self.extra = {}
+            self.extra[key] = value
+
+    def __contains__(self, key):
+        try:
+            self[key]
+            return True
+        except KeyError:
+            return False
+
+    def get(self, key, default=None):
+        """dict.get equivalent"""
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def keys(self):
+        """Field names present on this entry"""
+        return self.to_dict().keys()
+
+    def items(self):
+        """(field, value) pairs present on this entry"""
+        return self.to_dict().items()
+
+    def __eq__(self, other):
+        if isinstance(other, Entry):
+            other = other.to_dict()
+        if not isinstance(other, dict):
+            return NotImplemented
+        return self.to_dict() == other
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"Entry({self.to_dict()!r})"
@@ -0,0 +1,194 @@
+"""
+In-memory indexes for fast journal entry queries
+"""
+from bisect import bisect_left, bisect_right
+
+class DateSortedEntries:
+    """Entries kept sorted by date for bisect range lookups"""
+
+    def __init__(self):
+        self.dates = []
+        self.entries = []
+
+    def __len__(self):
+        return len(self.entries)
+
+    def add(self, entry):
+        """Insert an entry after any existing entries with the same date"""
+        position = bisect_right(self.dates, entry['date'])
+        self.dates.insert(position, entry['date'])
+        self.entries.insert(position, entry)
+
+    def remove(self, entry):
+        """Remove this exact entry object, returning True if it was found"""
+        position = bisect_left(self.dates, entry['date'])
+        end = bisect_right(self.dates, entry['date'])
+        for i in range(position, end):
+            if self.entries[i] is entry:
+                del self.dates[i]
+                del self.entries[i]
+                return True
+        return False
+
+    def range(self, start_date=None, end_date=None):
+        """Get entries with start_date <= date <= end_date in O(log n + k)"""
+        start = bisect_left(self.dates, start_date) if start_date else 0
+        end = bisect_right(self.dates, end_date) if end_date else len(self.dates)
+        return self.entries[start:end]
+
+    def page(self, start_date=None, end_date=None, after=None, limit=None):
+        """Get the next limit entries of a date range, returning (entries, cursor)
+
+        after is the cursor from the previous page, or None for the first. It
+        holds the last entry returned and its rank among entries of that date,
+        so paging resumes in the right place after adds and deletes in between.
+        """
+        if after is None:
+            start = bisect_left(self.dates, start_date) if start_date else 0
+        else:
+            last, rank = after
+            first_of_date = bisect_left(self.dates, last['date'])
+            # If the last entry was deleted since, the ones before it are still there
+            start = first_of_date + rank - 1
+            for i in range(first_of_date, bisect_right(self.dates, last['date'])):
+                if self.entries[i] is last:
+                    start = i + 1
+                    break
+        end = bisect_right(self.dates, end_date) if end_date else len(self.dates)
+        if limit is not None:
+            end = min(end, start + limit)
+        entries = self.entries[start:end]
+        if not entries:
+            return entries, None
+        last = entries[-1]
+        return entries, (last, end - bisect_left(self.dates, last['date']))
+
+class EntryIndex:
+    """Date-sorted index over all entries plus a per-mood secondary index"""
+
+    def __init__(self, entries=()):
+        self.rebuild(entries)
+
+    def rebuild(self, entries):
+        """Rebuild the indexes from scratch"""
+        self.by_date = DateSortedEntries()
+        self.by_mood = {}
+        for entry in sorted(entries, key=lambda e: e['date']):
+            self.add(entry)
+
+    def add(self, entry):
+        """Index a newly added entry"""
+        self.by_date.add(entry)
+        if entry['mood'] not in self.by_mood:
+            self.by_mood[entry['mood']] = DateSortedEntries()
+        self.by_mood[entry['mood']].add(entry)
+
+    def remove(self, entry):
+        """Drop a deleted entry from the indexes"""
+        self.by_date.remove(entry)
+        mood_entries = self.by_mood.get(entry['mood'])
+        if mood_entries is not None:
+            mood_entries.remove(entry)
+            if not mood_entries:
+                del self.by_mood[entry['mood']]
+
+    def query(self, start_date=None, end_date=None, mood=None):
+        """Get entries in date order matching a date range and optional mood"""
+        if mood:
+            mood_entries = self.by_mood.get(mood)
+            if mood_entries is None:
+                return []
+            return mood_entries.range(start_date, end_date)
+        return self.by_date.range(start_date, end_date)
+
+    def page(self, start_date=None, end_date=None, mood=None, after=None, limit=None):
+        """Like query, a page at a time (see DateSortedEntries.page)"""
+        if mood:
+            mood_entries = self.by_mood.get(mood)
+            if mood_entries is None:
+                return [], None
+            return mood_entries.page(start_date, end_date, after, limit)
+        return self.by_date.page(start_date, end_date, after, limit)
+
+class PositionMap:
+    """Map of entry id to entry and list position
+
+    Every entry gets a sequence number that increases along the list, so a
+    position is found by binary search over the sequence numbers and a
+    delete never renumbers the entries after it.
+    """
+
+    def __init__(self, entries=()):
+        self.rebuild(entries)
+
+    def rebuild(self, entries):
+        """Rebuild the map from scratch"""
+        self.entries = {entry['id']: entry for entry in entries}
+        self.sequence = {entry['id']: i for i, entry in enumerate(entries)}
+        self.next_sequence = len(self.sequence)
+
+    def __contains__(self, entry_id):
+        return entry_id in self.entries
+
+    def get(self, entry_id):
+        """Get the entry with an id, or None if it is unknown"""
+        return self.entries.get(entry_id)
+
+    def append(self, entry):
+        """Record an entry added at the end of the list"""
+        self.restore(entry, self.next_sequence)
+        self.next_sequence += 1
+
+    def restore(self, entry, sequence):
+        """Put back an entry removed by discard, at its old place in the order"""
+        self.entries[entry['id']] = entry
+        self.sequence[entry['id']] = sequence
+
+    def discard(self, entry_id):
+        """Forget a removed entry, returning its sequence number (or None)"""
+        self.entries.pop(entry_id, None)
+        return self.sequence.pop(entry_id, None)
+
+    def sequence_of(self, entry_id):
+        """Sequence number of an entry; sorting by it gives list order"""
+        return self.sequence[entry_id]
+
+    def lookup(self, entry_id, entries):
+        """Get the current position of an entry id in entries, or None if it is unknown"""
+        target = self.sequence.get(entry_id)
+        if target is None:
+            return None
+        return self.first_at(target, entries)
+
+    def first_at(self, target, entries):
+        """Position of the first entry whose sequence number is at least target"""
+        low, high = 0, len(entries)
+        while low < high:
+            middle = (low + high) // 2
+            if self.sequence[entries[middle]['id']] < target:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def page(self, entries, after=None, limit=None):
+        """Get the next limit entries in list order, returning (entries, cursor)
+
+        after is the cursor from the previous page, or None for the first.
+        Paging survives deletes in between; if the map was rebuilt since, it
+        resumes after the last entry returned, or stops if that entry is gone.
+        """
+        start = 0
+        if after is not None:
+            owner, sequence, entry_id = after
+            if owner is not self:
+                sequence = self.sequence.get(entry_id)
+                if sequence is None:
+                    return [], None
+            start = self.first_at(sequence + 1, entries)
+        end = len(entries) if limit is None else start + limit
+        page = entries[start:end]
+        if not page:
+            return page, None
+        last_id = page[-1]['id']
+        return page, (self, self.sequence[last_id], last_id)
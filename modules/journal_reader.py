@@ -0,0 +1,271 @@
+"""
+Incremental reader for journal snapshot files
+"""
+import codecs
+import gzip
+import json
+import lzma
+import mmap
+import os
+from Configuration.settings import AppConfig
+from modules.entry import Entry
+
+# Leading bytes of each supported compressed snapshot
+COMPRESSION_MAGIC = {
+    'gzip': b"\x1f\x8b",
+    'lzma': b"\xfd7zXZ\x00",
+}
+
+def detect_compression(filename):
+    """Name of the compression a journal file was written with, or None if it is plain"""
+    with open(filename, 'rb') as file:
+        head = file.read(max(len(magic) for magic in COMPRESSION_MAGIC.values()))
+    for compression, magic in COMPRESSION_MAGIC.items():
+        if head.startswith(magic):
+            return compression
+    return None
+
+def validate_entry(entry, message="Invalid data structure in journal file"):
+    """Raise ValueError unless entry is a dict with the required fields"""
+    if isinstance(entry, Entry):
+        return entry
+    if not isinstance(entry, dict) or 'date' not in entry or 'mood' not in entry:
+        raise ValueError(message)
+    return entry
+
+class JournalReader:
+    """Reads the entries of a JSON snapshot array without loading the whole file
+
+    Any JSON array is parsed forwards in chunks of AppConfig.LOAD_CHUNK_BYTES,
+    so the raw text never has to be in memory at once. Snapshots in line
+    layout ("[", one entry per line, "]") can also be read newest-first.
+    Gzip and lzma snapshots are detected and decompressed as a stream; they
+    are read forwards only (size is None for them).
+    """
+
+    def __init__(self, filename, chunk_bytes=None, use_mmap=None):
+        self.filename = filename
+        self.chunk_bytes = chunk_bytes or AppConfig.LOAD_CHUNK_BYTES
+        use_mmap = AppConfig.LOAD_USE_MMAP if use_mmap is None else use_mmap
+
+        self.compression = detect_compression(filename)
+        if self.compression == 'gzip':
+            self.file = gzip.open(filename, 'rb')
+        elif self.compression == 'lzma':
+            self.file = lzma.open(filename, 'rb')
+        if self.compression:
+            # The decompressed size isn't known without reading everything
+            self.size = None
+            self.view = None
+            return
+
+        self.file = open(filename, 'rb')
+        self.size = os.fstat(self.file.fileno()).st_size
+        self.view = None
+        if use_mmap and self.size:
+            try:
+                self.view = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+            except (OSError, ValueError):
+                # Some filesystems can't be mapped; plain reads work everywhere
+                self.view = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """Release the mapping and the file"""
+        if self.view is not None:
+            self.view.close()
+            self.view = None
+        self.file.close()
+
+    def read_bytes(self, start, end):
+        """Read the bytes in [start, end)"""
+        if self.view is not None:
+            return self.view[start:end]
+        self.file.seek(start)
+        return self.file.read(end - start)
+
+    @property
+    def reversible(self):
+        """Whether the file can be read newest-first (plain, not compressed)"""
+        return self.compression is None
+
+    def iter_stream(self, start):
+        """Yield decompressed bytes from start to the end, a chunk at a time"""
+        self.file.seek(start)
+        while True:
+            chunk = self.file.read(self.chunk_bytes)
+            if not chunk:
+                return
+            yield chunk
+
+    def iter_chunks(self, start=0, end=None):
+        """Yield the text in [start, end) in chunks, decoding UTF-8 incrementally"""
+        end = self.size if end is None else end
+        decoder = codecs.getincrementaldecoder('utf-8')()
+        for chunk in self.iter_byte_chunks(start, end):
+            yield decoder.decode(chunk)
+        yield decoder.decode(b'', final=True)
+
+    def iter_entries(self):
+        """Yield every entry in file order, validating each one as it is parsed"""
+        if self.is_line_layout():
+            return self.read_lines(2, self.size)
+        return self.iter_array_entries()
+
+    def iter_array_entries(self):
+        """Parse any JSON array of entries incrementally with raw_decode"""
+        decoder = json.JSONDecoder()
+        chunks = self.iter_chunks()
+        buffer = ""
+        position = 0
+        started = False
+
+        while True:
+            separators = ' \t\r\n,' if started else ' \t\r\n'
+            while position < len(buffer) and buffer[position] in separators:
+                position += 1
+            if position == len(buffer):
+                more = next(chunks, None)
+                if more is None:
+                    raise ValueError("Journal file ended unexpectedly")
+                # Everything buffered so far has been consumed
+                buffer, position = more, 0
+                continue
+
+            if not started:
+                if buffer[position] != '[':
+                    raise ValueError("Journal file must contain a list of entries")
+                started = True
+                position += 1
+                continue
+            if buffer[position] == ']':
+                return
+
+            try:
+                entry, position = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                more = next(chunks, None)
+                if more is None:
+                    raise
+                # The entry runs past the end of the buffer; keep only its start and read on
+                buffer, position = buffer[position:] + more, 0
+                continue
+            yield validate_entry(entry)
+
+    def iter_lines(self, start, end):
+        """Yield (offset, line) for each line in [start, end), reading a chunk at a time"""
+        pending = b""
+        pending_offset = start
+        position = start
+        while position < end:
+            chunk_end = min(position + self.chunk_bytes, end)
+            lines = (pending + self.read_bytes(position, chunk_end)).split(b"\n")
+            position = chunk_end
+            pending = lines.pop()
+            for line in lines:
+                yield pending_offset, line
+                pending_offset += len(line) + 1
+        if pending:
+            yield pending_offset, pending
+
+    def iter_line_blocks(self, start, end):
+        """Yield runs of whole lines in [start, end), about one chunk at a time"""
+        pending = b""
+        for chunk in self.iter_byte_chunks(start, end):
+            block = pending + chunk
+            cut = block.rfind(b"\n") + 1
+            pending = block[cut:]
+            if cut:
+                yield block[:cut]
+        if pending:
+            yield pending
+
+    def iter_byte_chunks(self, start, end):
+        """Yield the bytes in [start, end) a chunk at a time (end is ignored for streams)"""
+        if self.size is None:
+            yield from self.iter_stream(start)
+            return
+        position = start
+        while position < end:
+            chunk_end = min(position + self.chunk_bytes, end)
+            yield self.read_bytes(position, chunk_end)
+            position = chunk_end
+
+    def iter_lines_reversed(self, start, end):
+        """Yield (offset, line) for each line in [start, end), last line first"""
+        pending = b""
+        position = end
+        while position > start:
+            block_start = max(start, position - self.chunk_bytes)
+            lines = (self.read_bytes(block_start, position) + pending).split(b"\n")
+            position = block_start
+            # The first piece may continue further back, so it waits for the next block
+            pending = lines[0]
+            offsets = [block_start]
+            for line in lines[:-1]:
+                offsets.append(offsets[-1] + len(line) + 1)
+            for i in range(len(lines) - 1, 0, -1):
+                yield offsets[i], lines[i]
+        if pending:
+            yield start, pending
+
+    @staticmethod
+    def parse_line(line):
+        """Parse one line of a line-layout snapshot, or return None for structural lines"""
+        line = line.strip().rstrip(b",")
+        if not line or line in (b"[", b"]"):
+            return None
+        return validate_entry(json.loads(line))
+
+    def is_line_layout(self):
+        """Whether the snapshot was written one entry per line"""
+        if self.size is None:
+            self.file.seek(0)
+            if self.file.read(2) != b"[\n":
+                return False
+            try:
+                return self.parse_line(self.file.readline()) is not None
+            except (ValueError, UnicodeDecodeError):
+                return False
+
+        if self.read_bytes(0, min(self.size, 2)) != b"[\n":
+            return False
+        for offset, line in self.iter_lines(2, self.size):
+            try:
+                return self.parse_line(line) is not None
+            except (ValueError, UnicodeDecodeError):
+                return False
+        return False
+
+    def read_recent(self, count):
+        """Read the newest count entries of a line-layout snapshot
+
+        Returns (entries oldest first, offset where they start). Everything
+        before the offset is the older history, read later with read_lines(2, offset).
+        """
+        recent = []
+        boundary = self.size
+        for offset, line in self.iter_lines_reversed(2, self.size):
+            entry = self.parse_line(line)
+            if entry is None:
+                continue
+            if len(recent) >= count:
+                break
+            recent.append(entry)
+            boundary = offset
+        recent.reverse()
+        return recent, boundary
+
+    def read_lines(self, start, end):
+        """Yield the entries of a line-layout snapshot between two line offsets"""
+        for block in self.iter_line_blocks(start, end):
+            block = block.strip().rstrip(b"]").rstrip().rstrip(b",")
+            if block:
+                # One C-level parse per block of lines rather than one per entry
+                for entry in json.loads(b"[" + block + b"]"):
+                    yield validate_entry(entry)
@@ -0,0 +1,568 @@
+"""
+Storage backends for persisting journal entries
+"""
+import gzip
+import io
+import json
+import lzma
+import os
+import sqlite3
+import threading
+from urllib.request import pathname2url
+from Configuration.settings import AppConfig
+from modules.entry import Entry
+from modules.journal_reader import JournalReader, validate_entry
+
+def validate_entries(entries, message="Invalid data structure in journal file"):
+    """Raise ValueError if any entry is missing required fields"""
+    for entry in entries:
+        validate_entry(entry, message)
+
+def fsync_directory(path):
+    """Persist a rename by syncing its directory (a no-op where that isn't supported)"""
+    if not hasattr(os, 'O_DIRECTORY'):
+        return
+    try:
+        fd = os.open(path, os.O_RDONLY | os.O_DIRECTORY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+def write_atomic(filename, write, mode='w'):
+    """Call write(file) on a temp file, fsync it and rename it over filename
+
+    Pass mode='wb' to get a binary file, e.g. to wrap in a compressor.
+    """
+    temp_filename = filename + ".tmp"
+    try:
+        with open(temp_filename, mode) as file:
+            write(file)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_filename, filename)
+    except BaseException:
+        if os.path.exists(temp_filename):
+            os.remove(temp_filename)
+        raise
+    fsync_directory(os.path.dirname(os.path.abspath(filename)))
+
+def write_json_atomic(filename, data, indent=4):
+    """Atomically write data as a JSON document"""
+    write_atomic(filename, lambda file: json.dump(data, file, indent=indent, default=Entry.to_dict))
+
+def write_snapshot_lines(file, entries):
+    """Write entries as a JSON array with one entry per line
+
+    The result is still plain JSON, but JournalReader can also read it
+    newest-first by scanning lines back from the end of the file.
+    """
+    file.write("[\n")
+    separator = ""
+    for entry in entries:
+        file.write(separator)
+        file.write(json.dumps(entry, separators=(',', ':'), default=Entry.to_dict))
+        separator = ",\n"
+    file.write("\n]\n")
+
+def write_snapshot(filename, entries, compression=None):
+    """Atomically write a line-layout snapshot, optionally gzip or lzma compressed
+
+    JournalReader recognizes the compression from the file's leading bytes,
+    so the name doesn't change with the format.
+    """
+    if not compression:
+        write_atomic(filename, lambda file: write_snapshot_lines(file, entries))
+        return
+
+    def write(file):
+        if compression == 'gzip':
+            archive = gzip.GzipFile(fileobj=file, mode='wb', compresslevel=AppConfig.JOURNAL_COMPRESS_LEVEL)
+        elif compression == 'lzma':
+            archive = lzma.LZMAFile(file, 'wb', preset=AppConfig.JOURNAL_LZMA_PRESET)
+        else:
+            raise ValueError(f"Unknown journal compression: {compression}")
+        # Closing the wrapper finishes the archive but leaves file open for the fsync
+        with io.TextIOWrapper(archive, encoding='utf-8', newline='\n') as text:
+            write_snapshot_lines(text, entries)
+    write_atomic(filename, write, mode='wb')
+
+class JsonFileStorage:
+    """Journal stored as a JSON snapshot plus an optional append-only JSON Lines log
+
+    Snapshots are always written to a temp file, fsynced and renamed over the
+    original, so a crash leaves either the old or the new journal on disk.
+    Per-entry changes are coalesced: log records are written straight away
+    (surviving a process crash) but fsynced, compacted or, without the log,
+    folded into a snapshot once per debounce window by flush().
+    """
+
+    supports_query = False
+
+    def __init__(self, filename, append_only=None, read_only=False):
+        self.filename = filename
+        # Read-only storage never creates the journal file
+        self.read_only = read_only
+        self.log_filename = os.path.splitext(filename)[0] + AppConfig.LOG_EXTENSION
+        self.append_only = AppConfig.APPEND_ONLY_LOG if append_only is None else append_only
+        self.log_records = 0
+        self.log_file = None
+        self.log_unsynced = False
+        self.dirty_data = None
+        self.flush_timer = None
+        # Set while older entries are still unread after load_recent
+        self.history_reader = None
+        self.history_end = None
+        self.history_lock = threading.Lock()
+        # Adds run on the task worker, deletes on the Tk thread and flushes on a timer
+        self.lock = threading.RLock()
+
+    def initialize(self):
+        """Create an empty snapshot if none exists"""
+        if not self.read_only and not os.path.exists(self.filename):
+            write_json_atomic(self.filename, [], indent=None)
+
+    def load(self):
+        """Load the snapshot and replay any log records written since the last compaction"""
+        # Entries are validated as they stream out of the parser
+        with JournalReader(self.filename) as reader:
+            # Entries become compact Entry objects as they leave the JSON layer
+            data = [Entry.from_dict(entry) for entry in reader.iter_entries()]
+        self.log_records = self.replay_log(self.log_filename, data)
+        return data
+
+    @property
+    def history_pending(self):
+        """Whether load_recent left older entries still to be read"""
+        return self.history_reader is not None
+
+    def load_recent(self, count):
+        """Load only the newest count snapshot entries (plus the log), deferring the rest
+
+        Returns (entries, ids deleted by the log but not among them), or None when
+        the journal is small or its layout can't be read newest-first. Until
+        finish_history is called, snapshot rewrites are held back and changes
+        go to the log, so the unread history is never overwritten.
+        """
+        if os.path.getsize(self.filename) < AppConfig.LOAD_PROGRESSIVE_MIN_BYTES:
+            return None
+
+        reader = JournalReader(self.filename)
+        try:
+            if not reader.reversible or not reader.is_line_layout():
+                reader.close()
+                return None
+            recent, boundary = reader.read_recent(count)
+            recent = [Entry.from_dict(entry) for entry in recent]
+            unresolved_deletes = set()
+            self.log_records = self.replay_log(self.log_filename, recent, unresolved_deletes)
+        except (ValueError, UnicodeDecodeError):
+            # Let a full load decide whether the journal is really unreadable
+            reader.close()
+            return None
+
+        if boundary <= 2:
+            # Nothing older than what was just read
+            reader.close()
+            return recent, unresolved_deletes
+        self.history_reader = reader
+        self.history_end = boundary
+        return recent, unresolved_deletes
+
+    def load_history(self):
+        """Read the entries deferred by load_recent (safe to call from the worker)"""
+        with self.history_lock:
+            if self.history_reader is None:
+                return []
+            return [Entry.from_dict(entry) for entry in self.history_reader.read_lines(2, self.history_end)]
+
+    def finish_history(self, data=None):
+        """Release the deferred history and let held-back snapshot writes through
+
+        Pass data once the history has been merged into it; leave it out to
+        discard the history (the journal is being replaced anyway).
+        """
+        with self.history_lock:
+            if self.history_reader is not None:
+                self.history_reader.close()
+            self.history_reader = None
+            self.history_end = None
+        with self.lock:
+            if data is None:
+                self.dirty_data = None
+            elif self.dirty_data is not None:
+                self.dirty_data = data
+                self.schedule_flush()
+
+    def reset(self):
+        """Replace the journal with an empty one"""
+        with self.lock:
+            write_json_atomic(self.filename, [], indent=None)
+            self.drop_log()
+            self.dirty_data = None
+
+    def save(self, data):
+        """Rewrite the full snapshot"""
+        with self.lock:
+            if self.history_pending:
+                # data lacks the unread history; every change is in the log until it's merged
+                self.dirty_data = data
+                return
+            # Copying the list is a single step under the GIL, so other threads can't tear it
+            entries = list(data)
+            write_snapshot(self.filename, entries, AppConfig.JOURNAL_COMPRESSION)
+            # The snapshot now holds everything, so the log can be dropped
+            self.drop_log()
+            self.dirty_data = None
+
+    def compact(self, data):
+        """Fold the append-only log into a clean snapshot"""
+        self.save(data)
+
+    def add(self, data, entry):
+        """Persist an entry that was just appended to data"""
+        if self.append_only or self.history_pending:
+            self.append_records([{"op": "add", "entry": entry}], data)
+        else:
+            self.mark_dirty(data)
+
+    def add_many(self, data, entries):
+        """Persist a batch of entries just appended to data with one write"""
+        if self.history_pending:
+            self.append_records([{"op": "add", "entry": entry} for entry in entries], data)
+        else:
+            self.save(data)
+
+    def delete(self, data, index, entry):
+        """Persist the removal of the entry that was at index"""
+        if self.append_only or self.history_pending:
+            self.append_records([{"op": "delete", "id": entry['id']}], data)
+        else:
+            self.mark_dirty(data)
+
+    def append_records(self, records, data):
+        """Append records to the journal log; syncing and compaction wait for flush()"""
+        with self.lock:
+            if self.log_file is None:
+                self.log_file = open(self.log_filename, 'a')
+            self.log_file.write("".join(json.dumps(record, default=Entry.to_dict) + "\n" for record in records))
+            # Hand the records to the OS now so they survive the process dying
+            self.log_file.flush()
+            self.log_records += len(records)
+            self.log_unsynced = True
+            if self.log_records >= AppConfig.LOG_COMPACT_THRESHOLD:
+                self.dirty_data = data
+            self.schedule_flush()
+
+    def mark_dirty(self, data):
+        """Note that data needs a snapshot rewrite at the next flush"""
+        with self.lock:
+            self.dirty_data = data
+            self.schedule_flush()
+
+    def schedule_flush(self):
+        """Flush once the debounce window after the first pending change has passed"""
+        if self.flush_timer is None:
+            self.flush_timer = threading.Timer(AppConfig.SAVE_DEBOUNCE_MS / 1000, self.flush_pending)
+            self.flush_timer.daemon = True
+            self.flush_timer.start()
+
+    def flush_pending(self):
+        """Timer callback for the debounce window"""
+        try:
+            self.flush()
+        except OSError:
+            # Changes stay pending; the next change or the flush on close retries
+            pass
+
+    def flush(self):
+        """Make every pending change durable now"""
+        with self.lock:
+            if self.flush_timer is not None:
+                self.flush_timer.cancel()
+                self.flush_timer = None
+
+            if self.dirty_data is not None and not self.history_pending:
+                # Covers both non-log mode and a log that has grown past the compaction threshold
+                self.save(self.dirty_data)
+            if self.log_unsynced and self.log_file is not None:
+                os.fsync(self.log_file.fileno())
+                self.log_unsynced = False
+
+    def drop_log(self):
+        """Remove the journal log"""
+        with self.lock:
+            if self.log_file is not None:
+                self.log_file.close()
+                self.log_file = None
+            if os.path.exists(self.log_filename):
+                os.remove(self.log_filename)
+            self.log_records = 0
+            self.log_unsynced = False
+
+    def close(self):
+        """Flush pending changes and release the log file"""
+        with self.lock:
+            self.flush()
+            if self.log_file is not None:
+                self.log_file.close()
+                self.log_file = None
+
+    @staticmethod
+    def replay_log(log_filename, data, unresolved_deletes=None):
+        """Apply the records in a journal log to data, returning the record count
+        
+        When data is only part of the journal, pass a set as unresolved_deletes
+        to collect deleted ids that weren't found in it. Replay is idempotent:
+        a crash between writing a snapshot and dropping the log leaves records
+        the snapshot already holds, so adds of ids already present are skipped.
+        """
+        if not os.path.exists(log_filename):
+            return 0
+
+        count = 0
+        deleted_ids = set()
+        present_ids = None
+        with open(log_filename, 'r') as file:
+            for line in file:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # A crash mid-append can leave a partial last line
+                    continue
+
+                if record.get('op') == 'add':
+                    entry = record.get('entry', {})
+                    validate_entries([entry], "Invalid data structure in journal log")
+                    entry = Entry.from_dict(entry)
+                    if entry.id is not None:
+                        if present_ids is None:
+                            present_ids = {existing.get('id') for existing in data}
+                        if entry.id in present_ids:
+                            count += 1
+                            continue
+                        present_ids.add(entry.id)
+                    data.append(entry)
+                elif record.get('op') == 'delete' and 'id' in record:
+                    # Id tombstones are applied in one pass at the end
+                    deleted_ids.add(record['id'])
+                elif record.get('op') == 'delete':
+                    # Older logs address deletes by position, which needs the list as of this record
+                    if unresolved_deletes is not None:
+                        raise ValueError("Journal log needs the full journal to replay")
+                    JsonFileStorage.remove_ids(data, deleted_ids)
+                    index = record.get('index', -1)
+                    if 0 <= index < len(data):
+                        data.pop(index)
+                    present_ids = None
+                count += 1
+
+        if unresolved_deletes is not None:
+            unresolved_deletes.update(deleted_ids - {entry.get('id') for entry in data})
+        JsonFileStorage.remove_ids(data, deleted_ids)
+        return count
+
+    @staticmethod
+    def remove_ids(data, deleted_ids):
+        """Remove entries whose id is in deleted_ids, then clear the set"""
+        if deleted_ids:
+            data[:] = [entry for entry in data if entry.get('id') not in deleted_ids]
+            deleted_ids.clear()
+
+class SQLiteStorage:
+    """Journal stored in a SQLite database with indexed date and mood columns"""
+
+    supports_query = True
+
+    def __init__(self, filename, migrate_from=None, read_only=False):
+        self.filename = filename
+        self.migrate_from = migrate_from
+        # Read-only storage opens an existing database without creating or migrating one
+        self.read_only = read_only
+        self.connection = None
+        # Long writes run on the task worker without DataManager's lock; this orders them with other calls
+        self.lock = threading.RLock()
+
+    def initialize(self):
+        """Open the database, creating the schema and migrating a JSON journal on first use"""
+        if self.read_only:
+            if not os.path.exists(self.filename):
+                raise FileNotFoundError(f"No SQLite journal at {self.filename}")
+            uri = "file:" + pathname2url(os.path.abspath(self.filename)) + "?mode=ro"
+            self.connection = sqlite3.connect(uri, uri=True, check_same_thread=False)
+            return
+
+        is_new = not os.path.exists(self.filename)
+        # Saves and exports run on the background worker, not the thread that opened the database
+        self.connection = sqlite3.connect(self.filename, check_same_thread=False)
+        with self.connection:
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, "
+                "entry_id TEXT, "
+                "date TEXT NOT NULL, "
+                "mood TEXT NOT NULL, "
+                "notes TEXT NOT NULL DEFAULT '', "
+                "extra TEXT)"
+            )
+            columns = [row[1] for row in self.connection.execute("PRAGMA table_info(entries)")]
+            if 'entry_id' not in columns:
+                # Databases created before entries had stable ids
+                self.connection.execute("ALTER TABLE entries ADD COLUMN entry_id TEXT")
+            self.connection.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_entries_entry_id ON entries (entry_id)")
+            self.connection.execute("CREATE INDEX IF NOT EXISTS idx_entries_date ON entries (date)")
+            self.connection.execute("CREATE INDEX IF NOT EXISTS idx_entries_mood ON entries (mood, date)")
+
+        if is_new and self.migrate_from and os.path.exists(self.migrate_from):
+            self.migrate(self.migrate_from)
+
+    def migrate(self, json_filename):
+        """One-shot import of an existing JSON journal (snapshot plus log)"""
+        source = JsonFileStorage(json_filename)
+        with self.connection:
+            self.insert_rows(source.load())
+
+    def load(self):
+        """Load all entries in insertion order"""
+        with self.lock:
+            cursor = self.connection.execute("SELECT entry_id, date, mood, notes, extra FROM entries ORDER BY id")
+            return [self.row_to_entry(row) for row in cursor]
+
+    def reset(self):
+        """Replace the journal with an empty one"""
+        with self.lock:
+            with self.connection:
+                self.connection.execute("DELETE FROM entries")
+
+    def save(self, data):
+        """Replace every row with data in a single transaction"""
+        with self.lock:
+            with self.connection:
+                self.connection.execute("DELETE FROM entries")
+                self.insert_rows(data)
+
+    def compact(self, data):
+        """Reclaim free pages left behind by deletes"""
+        with self.lock:
+            self.connection.execute("VACUUM")
+
+    history_pending = False
+
+    def load_recent(self, count):
+        """Progressive loading isn't needed: SQLite reads rows without parsing the whole file"""
+        return None
+
+    def flush(self):
+        """Nothing to do: every change is committed in its own transaction"""
+
+    def close(self):
+        """Close the database connection"""
+        with self.lock:
+            if self.connection is not None:
+                self.connection.close()
+                self.connection = None
+
+    def add(self, data, entry):
+        """Insert a single entry"""
+        with self.lock:
+            with self.connection:
+                self.insert_rows([entry])
+
+    def add_many(self, data, entries):
+        """Insert a batch of entries in a single transaction"""
+        with self.lock:
+            with self.connection:
+                self.insert_rows(entries)
+
+    def delete(self, data, index, entry):
+        """Delete a single entry by its id"""
+        with self.lock:
+            with self.connection:
+                self.connection.execute("DELETE FROM entries WHERE entry_id = ?", (entry['id'],))
+
+    def query(self, start_date=None, end_date=None, mood=None):
+        """Filter entries in SQL using the date and mood indexes"""
+        with self.lock:
+            return list(self.iter_query(start_date, end_date, mood))
+
+    def iter_query(self, start_date=None, end_date=None, mood=None):
+        """Like query, but streams rows from the cursor instead of building a list"""
+        clauses, params = self.filter_clauses(start_date, end_date, mood)
+        sql = "SELECT entry_id, date, mood, notes, extra FROM entries"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY date, id"
+        for row in self.connection.execute(sql, params):
+            yield self.row_to_entry(row)
+
+    def query_page(self, start_date=None, end_date=None, mood=None, after=None, limit=None):
+        """Like query, a page at a time, returning (entries, cursor)
+
+        after is the cursor from the previous page (the last row's date and
+        rowid), or None for the first. Each page is a separate keyset query,
+        so no cursor stays open on the connection between pages.
+        """
+        clauses, params = self.filter_clauses(start_date, end_date, mood)
+        if after is not None:
+            clauses.append("(date > ? OR (date = ? AND id > ?))")
+            params.extend((after[0], after[0], after[1]))
+        sql = "SELECT id, entry_id, date, mood, notes, extra FROM entries"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY date, id"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        with self.lock:
+            rows = self.connection.execute(sql, params).fetchall()
+        if not rows:
+            return [], None
+        return [self.row_to_entry(row[1:]) for row in rows], (rows[-1][2], rows[-1][0])
+
+    @staticmethod
+    def filter_clauses(start_date=None, end_date=None, mood=None):
+        """WHERE clauses and parameters for a date range and mood filter"""
+        clauses = []
+        params = []
+        if start_date:
+            clauses.append("date >= ?")
+            params.append(start_date)
+        if end_date:
+            clauses.append("date <= ?")
+            params.append(end_date)
+        if mood:
+            clauses.append("mood = ?")
+            params.append(mood)
+        return clauses, params
+
+    def insert_rows(self, entries):
+        """Insert entries, keeping any fields beyond date/mood/notes as JSON"""
+        rows = []
+        for entry in entries:
+            extra = {k: v for k, v in entry.items() if k not in ('id', 'date', 'mood', 'notes')}
+            rows.append((entry.get('id'), entry['date'], entry['mood'], entry.get('notes', ''),
+                         json.dumps(extra) if extra else None))
+        self.connection.executemany(
+            "INSERT INTO entries (entry_id, date, mood, notes, extra) VALUES (?, ?, ?, ?, ?)", rows
+        )
+
+    @staticmethod
+    def row_to_entry(row):
+        """Convert a database row back into an Entry"""
+        entry_id, date, mood, notes, extra = row
+        fields = json.loads(extra) if extra else {}
+        return Entry(date, mood, notes, entry_id or None, fields.pop('sentiment_score', None), fields)
+
+def create_storage(filename, backend=None, append_only=None, read_only=False):
+    """Create the storage backend selected in AppConfig"""
+    backend = backend or AppConfig.STORAGE_BACKEND
+    if backend == "json":
+        return JsonFileStorage(filename, append_only, read_only)
+    if backend == "sqlite":
+        db_filename = os.path.splitext(filename)[0] + AppConfig.SQLITE_EXTENSION
+        return SQLiteStorage(db_filename, migrate_from=filename, read_only=read_only)
+    raise ValueError(f"Unknown storage backend: {backend}")
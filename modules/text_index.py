@@ -0,0 +1,120 @@
+"""
+Inverted full-text index over entry notes
+"""
+import re
+from bisect import bisect_left, insort
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+class NoteTextIndex:
+    """Token -> set of entry ids, plus a sorted term list for prefix lookups
+
+    The index is built on the first search rather than at load time; once built
+    it is kept current by add/remove, and dropped again by invalidate.
+    """
+
+    def __init__(self):
+        self.invalidate()
+
+    @staticmethod
+    def tokenize(text):
+        """Split text into lowercase word tokens"""
+        return TOKEN_PATTERN.findall(text.lower())
+
+    @classmethod
+    def parse_query(cls, query):
+        """Parse a search string into (terms, prefixes); a trailing * marks a prefix"""
+        terms = set()
+        prefixes = set()
+        for word in query.split():
+            tokens = cls.tokenize(word)
+            if word.endswith('*') and tokens:
+                # Only the last token of a word like "re-run*" is a prefix
+                prefixes.add(tokens.pop())
+            terms.update(tokens)
+        return terms, prefixes
+
+    @classmethod
+    def matches(cls, notes, query):
+        """Check a single note against a query without using the index"""
+        terms, prefixes = cls.parse_query(query)
+        if not terms and not prefixes:
+            return False
+        tokens = set(cls.tokenize(notes))
+        if not terms <= tokens:
+            return False
+        return all(any(token.startswith(prefix) for token in tokens) for prefix in prefixes)
+
+    @property
+    def built(self):
+        """Whether the index currently reflects the journal"""
+        return self.postings is not None
+
+    def invalidate(self):
+        """Drop the index so the next search rebuilds it"""
+        self.postings = None
+        self.terms = []
+
+    def rebuild(self, entries):
+        """Build the index from scratch"""
+        self.postings = {}
+        for entry in entries:
+            for token in set(self.tokenize(entry.get('notes', ''))):
+                self.postings.setdefault(token, set()).add(entry['id'])
+        self.terms = sorted(self.postings)
+
+    def add(self, entry):
+        """Index a newly added entry (no-op until the index has been built)"""
+        if not self.built:
+            return
+        for token in set(self.tokenize(entry.get('notes', ''))):
+            ids = self.postings.get(token)
+            if ids is None:
+                ids = self.postings[token] = set()
+                insort(self.terms, token)
+            ids.add(entry['id'])
+
+    def remove(self, entry):
+        """Drop a deleted entry from the index"""
+        if not self.built:
+            return
+        for token in set(self.tokenize(entry.get('notes', ''))):
+            ids = self.postings.get(token)
+            if ids is None:
+                continue
+            ids.discard(entry['id'])
+            if not ids:
+                del self.postings[token]
+                del self.terms[bisect_left(self.terms, token)]
+
+    def prefix_ids(self, prefix):
+        """Union of the posting lists of every term starting with prefix"""
+        ids = set()
+        position = bisect_left(self.terms, prefix)
+        while position < len(self.terms) and self.terms[position].startswith(prefix):
+            ids |= self.postings[self.terms[position]]
+            position += 1
+        return ids
+
+    def search(self, query, entries):
+        """Get the ids of entries whose notes contain every term (AND) in query
+
+        entries is only used to build the index on first use.
+        """
+        if not self.built:
+            self.rebuild(entries)
+
+        terms, prefixes = self.parse_query(query)
+        # Intersect the smallest posting lists first
+        candidates = [self.postings.get(term, set()) for term in terms]
+        candidates += [self.prefix_ids(prefix) for prefix in prefixes]
+        if not candidates:
+            return set()
+        candidates.sort(key=len)
+
+        result = set(candidates[0])
+        for ids in candidates[1:]:
+            if not result:
+                break
+            result &= ids
+        return result
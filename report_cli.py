@@ -0,0 +1,115 @@
+"""
+Headless report generation for one or more journals
+
+Writes the weekly, monthly, summary and timeline reports without a display:
+    python report_cli.py journal.json [more journals...] --output-dir reports
+Each journal gets its own folder, e.g. reports/journal/weekly.txt.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from Configuration.settings import AppConfig
+from modules.data_manager import DataManager
+from utils.report_generator import ReportGenerator
+
+REPORT_TYPES = ("weekly", "monthly", "summary", "timeline")
+FORMATS = ("text", "json", "png")
+CHART_REPORTS = ("summary", "timeline")  # Reports that have a PNG rendering
+
+class JournalError(Exception):
+    """A journal could not be read or written"""
+
+def raise_error(title, message, warning=False):
+    """DataManager error handler for batch runs
+
+    Raising stops the journal from being reset to empty when it can't be read,
+    which the interactive app does after warning the user.
+    """
+    raise JournalError(f"{title}: {message}")
+
+def write_text(filename, text):
+    """Write a text report"""
+    with open(filename, 'w', encoding='utf-8') as file:
+        file.write(text)
+
+def write_json(filename, data):
+    """Write a JSON report"""
+    with open(filename, 'w', encoding='utf-8') as file:
+        json.dump(data, file, indent=4)
+
+def generate_reports(report_generator, output_dir, report_types, formats):
+    """Write the selected reports for the loaded journal, returning the files written"""
+    text_reports = {
+        "weekly": report_generator.generate_weekly_report_text,
+        "monthly": report_generator.generate_monthly_report_text,
+        "summary": report_generator.generate_summary_report_text,
+        "timeline": report_generator.generate_timeline_report_text,
+    }
+    written = []
+    for report_type in report_types:
+        base = os.path.join(output_dir, report_type)
+        if "text" in formats:
+            write_text(base + ".txt", text_reports[report_type]())
+            written.append(base + ".txt")
+        if "json" in formats:
+            write_json(base + ".json", report_generator.get_report_data(report_type))
+            written.append(base + ".json")
+        if "png" in formats and report_type in CHART_REPORTS:
+            # Nothing is written for an empty journal
+            if report_generator.render_chart(report_type, base + ".png"):
+                written.append(base + ".png")
+    return written
+
+def process_journal(filename, args, chart_cache):
+    """Load one journal and write its reports"""
+    if not os.path.exists(filename):
+        raise JournalError(f"Journal not found: {filename}")
+
+    stem = os.path.splitext(os.path.basename(filename))[0]
+    output_dir = os.path.join(args.output_dir, stem)
+    os.makedirs(output_dir, exist_ok=True)
+
+    # Reporting must leave the journal exactly as it was: no id backfill, no SQLite migration
+    data_manager = DataManager(filename, backend=args.backend, error_handler=raise_error, read_only=True)
+    try:
+        report_generator = ReportGenerator(data_manager)
+        # Share the offscreen figures across journals so only the artists are redrawn
+        report_generator.headless_charts = chart_cache
+        return len(data_manager.data), generate_reports(report_generator, output_dir,
+                                                        args.reports, args.formats)
+    finally:
+        data_manager.close()
+
+def main(argv=None):
+    """Command line entry point; returns the number of journals that failed"""
+    parser = argparse.ArgumentParser(description="Generate mood journal reports without a display")
+    parser.add_argument("journals", nargs="+", help="journal files to report on")
+    parser.add_argument("-o", "--output-dir", default="reports", help="folder for the report files")
+    parser.add_argument("-r", "--reports", nargs="+", choices=REPORT_TYPES, default=list(REPORT_TYPES))
+    parser.add_argument("-f", "--formats", nargs="+", choices=FORMATS, default=list(FORMATS))
+    parser.add_argument("--backend", choices=("json", "sqlite"), default=AppConfig.STORAGE_BACKEND)
+    parser.add_argument("-q", "--quiet", action="store_true", help="only report failures")
+    args = parser.parse_args(argv)
+
+    # Reports need the whole journal at once, so skip the GUI's newest-first loading
+    AppConfig.LOAD_PROGRESSIVE = False
+
+    failures = 0
+    chart_cache = {}
+    for filename in args.journals:
+        start = time.perf_counter()
+        try:
+            count, written = process_journal(filename, args, chart_cache)
+        except (JournalError, OSError, ValueError) as e:
+            failures += 1
+            print(f"{filename}: {e}", file=sys.stderr)
+            continue
+        if not args.quiet:
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            print(f"{filename}: {count} entries, {len(written)} files in {elapsed_ms:.0f} ms")
+    return failures
+
+if __name__ == "__main__":
+    sys.exit(1 if main() else 0)
@@ -0,0 +1,128 @@
+"""
+Tests for incremental journal backups
+"""
+import os
+import shutil
+import tempfile
+import unittest
+from Configuration.settings import AppConfig
+from modules.backup_store import BackupStore
+from modules.entry import Entry
+
+def make_entry(number, notes=None):
+    return Entry(f"2024-01-{number % 28 + 1:02d}", "Happy", notes or f"note {number}", id=str(number))
+
+class BackupStoreTest(unittest.TestCase):
+    """Base + delta chains must rebuild every point in time"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.store = BackupStore(os.path.join(self.directory, "journal_backups"))
+        self.max_deltas = AppConfig.BACKUP_MAX_DELTAS
+        AppConfig.BACKUP_MAX_DELTAS = 3
+
+    def tearDown(self):
+        AppConfig.BACKUP_MAX_DELTAS = self.max_deltas
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def journal_versions(self):
+        """Successive journals covering adds, deletes, edits, re-adds and a reorder"""
+        entries = [make_entry(number) for number in range(5)]
+        versions = [list(entries)]
+        entries = entries + [make_entry(5), make_entry(6)]
+        versions.append(list(entries))
+        removed = entries.pop(2)
+        versions.append(list(entries))
+        entries[0] = make_entry(0, "edited")
+        versions.append(list(entries))
+        # Content dropped two backups ago comes back
+        entries = entries + [removed]
+        versions.append(list(entries))
+        entries = list(reversed(entries))
+        versions.append(list(entries))
+        entries = entries + [make_entry(7), make_entry(7)]
+        versions.append(list(entries))
+        entries = entries[:-1]
+        versions.append(list(entries))
+        # Enough further deltas to start a fresh base
+        for number in range(10, 13):
+            entries = entries + [make_entry(number)]
+            versions.append(list(entries))
+        return versions
+
+    def back_up(self, versions):
+        """Create one backup per version; return {backup id: expected entries}"""
+        expected = {}
+        for entries in versions:
+            record, created = self.store.create(entries)
+            self.assertTrue(created)
+            expected[record['id']] = [entry.to_dict() for entry in entries]
+        return expected
+
+    def assert_restorable(self, expected):
+        for record in self.store.list_backups():
+            self.assertEqual(self.store.reconstruct(record['id']), expected[record['id']])
+
+    def test_round_trip(self):
+        expected = self.back_up(self.journal_versions())
+        kinds = [record['kind'] for record in self.store.list_backups()]
+        self.assertIn('delta', kinds)
+        self.assertGreater(kinds.count('base'), 1)
+        self.assert_restorable(expected)
+
+        # A fresh store rebuilds its head from disk and keeps extending the chain
+        store = BackupStore(self.store.directory)
+        entries = self.journal_versions()[-1] + [make_entry(8)]
+        record, created = store.create(entries)
+        self.assertTrue(created)
+        self.assertEqual(store.reconstruct(record['id']), [entry.to_dict() for entry in entries])
+
+    def test_unchanged_journal_is_not_backed_up(self):
+        entries = self.journal_versions()[0]
+        first, _ = self.store.create(entries)
+        record, created = self.store.create(list(entries))
+        self.assertFalse(created)
+        self.assertEqual(record['id'], first['id'])
+        self.assertEqual(len(self.store.list_backups()), 1)
+
+    def test_squash_keeps_later_points(self):
+        expected = self.back_up(self.journal_versions())
+        records = self.store.list_backups()
+        for record in records[1:]:
+            if record['kind'] == 'delta':
+                break
+        removed = self.store.squash(record['id'])
+
+        remaining = self.store.list_backups()
+        self.assertEqual(removed, records.index(record))
+        self.assertEqual(remaining[0]['id'], record['id'])
+        self.assertEqual(remaining[0]['kind'], 'base')
+        self.assert_restorable(expected)
+        files = {entry.name for entry in os.scandir(self.store.directory)}
+        self.assertEqual(files, {record['file'] for record in remaining} | {BackupStore.MANIFEST_FILENAME})
+
+    def test_squash_keeps_re_added_content(self):
+        entries = [make_entry(number) for number in range(5)]
+        dropped = entries[:2] + entries[3:]
+        # The last delta re-adds content whose body is only stored in the first backup
+        expected = self.back_up([entries, dropped, dropped + [entries[2]]])
+        self.assertEqual([record['kind'] for record in self.store.list_backups()], ['base', 'delta', 'delta'])
+        self.store.squash(2)
+        self.assert_restorable(expected)
+
+    def test_prune(self):
+        expected = self.back_up(self.journal_versions())
+        for keep in (5, 3, 1):
+            self.store.prune(keep)
+            self.assertEqual(len(self.store.list_backups()), keep)
+            self.assert_restorable(expected)
+        self.assertEqual(self.store.prune(1), 0)
+
+        # Backups made after pruning still chain onto the squashed base
+        entries = self.journal_versions()[-1] + [make_entry(9)]
+        record, _ = self.store.create(entries)
+        self.assertEqual(record['kind'], 'delta')
+        self.assertEqual(self.store.reconstruct(record['id']), [entry.to_dict() for entry in entries])
+
+if __name__ == "__main__":
+    unittest.main()
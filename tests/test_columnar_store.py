@@ -0,0 +1,82 @@
+"""
+Tests for the optional NumPy column store
+"""
+import random
+import unittest
+from Configuration.settings import AppConfig
+from modules.columnar_store import ColumnarEntryStore
+from modules.entry import Entry
+from modules.entry_index import EntryIndex
+
+MOODS = ["Happy", "Sad", "Calm", "Tired"]
+
+FILTERS = [
+    {},
+    {'mood': 'Happy'},
+    {'mood': 'Furious'},
+    {'start_date': '2024-01-05'},
+    {'end_date': '2024-01-05'},
+    {'start_date': '2024-01-03', 'end_date': '2024-01-08', 'mood': 'Sad'},
+    {'start_date': '2024-01-08', 'end_date': '2024-01-03'},
+    {'start_date': '2023-12-01', 'end_date': '2024-02-29'},
+]
+
+def random_entry(rng, number):
+    # Few distinct dates so ties (kept in insertion order) are common
+    return Entry(f"2024-01-{rng.randint(1, 10):02d}", rng.choice(MOODS), f"note {number}", id=str(number))
+
+@unittest.skipUnless(ColumnarEntryStore.available(), "NumPy is not installed")
+class ColumnarEntryStoreTest(unittest.TestCase):
+    """Vectorized filters must return what EntryIndex.query does"""
+
+    def setUp(self):
+        # Small columns so appends exercise growing them
+        self.min_capacity = AppConfig.COLUMNAR_MIN_CAPACITY
+        AppConfig.COLUMNAR_MIN_CAPACITY = 16
+
+    def tearDown(self):
+        AppConfig.COLUMNAR_MIN_CAPACITY = self.min_capacity
+
+    def assert_same_results(self, entries, columns, index):
+        self.assertEqual(columns.count, len(entries))
+        for filters in FILTERS:
+            self.assertTrue(columns.can_filter(filters))
+            rows = columns.filter_rows(filters.get('start_date'), filters.get('end_date'), filters.get('mood'))
+            expected = index.query(filters.get('start_date'), filters.get('end_date'), filters.get('mood'))
+            self.assertEqual([entries[row] for row in rows], expected, filters)
+        for row, entry in enumerate(entries):
+            self.assertEqual(columns.get_notes(row), entry.notes)
+
+    def test_queries_match_entry_index(self):
+        rng = random.Random(7)
+        entries = [random_entry(rng, number) for number in range(50)]
+        columns = ColumnarEntryStore(entries)
+        index = EntryIndex(entries)
+        self.assert_same_results(entries, columns, index)
+
+        # Appends and deletes, as DataManager.attach and detach apply them
+        for number in range(50, 400):
+            if entries and rng.random() < 0.3:
+                row = rng.randrange(len(entries))
+                index.remove(entries.pop(row))
+                columns.delete(row)
+            else:
+                entry = random_entry(rng, number)
+                entries.append(entry)
+                index.add(entry)
+                columns.append(entry)
+            if number % 50 == 0:
+                self.assert_same_results(entries, columns, index)
+        self.assert_same_results(entries, columns, index)
+
+    def test_malformed_dates_fall_back(self):
+        entries = [Entry("2024-01-01", "Happy", id="a"), Entry("someday", "Sad", id="b")]
+        columns = ColumnarEntryStore(entries)
+        self.assertFalse(columns.can_filter({'mood': 'Sad'}))
+
+        columns.delete(1)
+        self.assertTrue(columns.can_filter({'mood': 'Sad'}))
+        self.assertFalse(columns.can_filter({'start_date': '2024-13-01'}))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,104 @@
+"""
+Tests for bulk entry imports
+"""
+import os
+import shutil
+import tempfile
+import unittest
+from Configuration.settings import AppConfig
+from modules.data_manager import DataManager
+from modules.entry import Entry
+
+MOODS = ["Happy", "Sad", "Calm"]
+
+class ImportEntriesTest(unittest.TestCase):
+    """Bad rows are reported and skipped; accepted rows get unique ids"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.progressive = AppConfig.LOAD_PROGRESSIVE
+        AppConfig.LOAD_PROGRESSIVE = False
+
+    def tearDown(self):
+        AppConfig.LOAD_PROGRESSIVE = self.progressive
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def open_journal(self, backend):
+        filename = os.path.join(self.directory, f"{backend}_journal.json")
+        return DataManager(filename, append_only=True, backend=backend)
+
+    def test_invalid_rows_are_rejected(self):
+        rows = [
+            (2, {"date": "2024-01-01", "mood": "Happy", "notes": "kept"}),
+            (3, None),
+            (4, {"date": "2024-01-02"}),
+            (5, {"date": "01/02/2024", "mood": "Happy"}),
+            (6, {"date": "2024-01-03", "mood": "Furious"}),
+            (7, {"date": "2024-01-04", "mood": 3}),
+            (8, {"date": "2024-01-05", "mood": " Calm ", "notes": "also kept"}),
+        ]
+        for backend in ("json", "sqlite"):
+            with self.subTest(backend=backend):
+                data_manager = self.open_journal(backend)
+                result = data_manager.import_entries(iter(rows), MOODS)
+                self.assertEqual(result['imported'], 2)
+                self.assertEqual(result['invalid'], 5)
+                self.assertEqual([line for line, _ in result['errors']], [3, 4, 5, 6, 7])
+                self.assertEqual([(entry.mood, entry.notes) for entry in data_manager.data],
+                                 [("Happy", "kept"), ("Calm", "also kept")])
+                data_manager.close()
+
+                reloaded = self.open_journal(backend)
+                self.assertEqual([entry.notes for entry in reloaded.data], ["kept", "also kept"])
+                reloaded.close()
+
+    def test_error_list_is_capped(self):
+        data_manager = self.open_journal("json")
+        rows = [(line, None) for line in range(AppConfig.IMPORT_MAX_ERRORS + 10)]
+        result = data_manager.import_entries(iter(rows), MOODS)
+        self.assertEqual(result['invalid'], AppConfig.IMPORT_MAX_ERRORS + 10)
+        self.assertEqual(len(result['errors']), AppConfig.IMPORT_MAX_ERRORS)
+        self.assertEqual(data_manager.data, [])
+        data_manager.close()
+
+    def test_ids_are_deduplicated(self):
+        data_manager = self.open_journal("json")
+        data_manager.add_entry(Entry("2024-01-01", "Happy", "existing", id="taken"))
+        rows = [
+            (2, {"date": "2024-02-01", "mood": "Sad", "id": "taken"}),
+            (3, {"date": "2024-02-02", "mood": "Sad", "id": "shared"}),
+            (4, {"date": "2024-02-03", "mood": "Sad", "id": "shared"}),
+            (5, {"date": "2024-02-04", "mood": "Sad"}),
+        ]
+        result = data_manager.import_entries(iter(rows), MOODS)
+        self.assertEqual(result['imported'], 4)
+
+        ids = [entry.id for entry in data_manager.data]
+        self.assertEqual(len(ids), 5)
+        self.assertEqual(len(set(ids)), 5)
+        self.assertTrue(all(ids))
+        self.assertEqual(data_manager.get_entry("taken").notes, "existing")
+        self.assertEqual(ids.count("shared"), 1)
+        for entry in data_manager.data:
+            self.assertIs(data_manager.get_entry(entry.id), entry)
+        data_manager.close()
+
+        reloaded = self.open_journal("json")
+        self.assertEqual([entry.id for entry in reloaded.data], ids)
+        reloaded.close()
+
+    def test_duplicate_content_is_skipped(self):
+        data_manager = self.open_journal("json")
+        data_manager.add_entry(Entry("2024-01-01", "Happy", "same"))
+        rows = [
+            (2, {"date": "2024-01-01", "mood": "Happy", "notes": "same"}),
+            (3, {"date": "2024-01-02", "mood": "Sad", "notes": "new"}),
+            (4, {"date": "2024-01-02", "mood": "Sad", "notes": "new"}),
+        ]
+        result = data_manager.import_entries(iter(rows), MOODS, dedupe=True)
+        self.assertEqual((result['imported'], result['duplicates'], result['invalid']), (1, 2, 0))
+        self.assertEqual([entry.notes for entry in data_manager.data], ["same", "new"])
+        data_manager.close()
+
+if __name__ == "__main__":
+    unittest.main()
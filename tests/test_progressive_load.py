@@ -0,0 +1,97 @@
+"""
+Tests for progressively loading large journals
+"""
+import os
+import shutil
+import tempfile
+import unittest
+from benchmarks.synthetic_journal import write_journal
+from Configuration.settings import AppConfig
+from modules.data_manager import DataManager
+from modules.entry import Entry
+
+class ProgressiveLoadTest(unittest.TestCase):
+    """Edits made while the history loads must survive the merge"""
+
+    COUNT = 300
+    RECENT = 40
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.filename = os.path.join(self.directory, "journal.json")
+        write_journal(self.filename, self.COUNT)
+        self.settings = (AppConfig.LOAD_PROGRESSIVE, AppConfig.LOAD_PROGRESSIVE_MIN_BYTES,
+                         AppConfig.LOAD_RECENT_ENTRIES)
+        AppConfig.LOAD_PROGRESSIVE_MIN_BYTES = 0
+        AppConfig.LOAD_RECENT_ENTRIES = self.RECENT
+
+    def tearDown(self):
+        (AppConfig.LOAD_PROGRESSIVE, AppConfig.LOAD_PROGRESSIVE_MIN_BYTES,
+         AppConfig.LOAD_RECENT_ENTRIES) = self.settings
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def load(self, progressive):
+        AppConfig.LOAD_PROGRESSIVE = progressive
+        return DataManager(self.filename, append_only=True)
+
+    def test_edits_while_history_pending(self):
+        # A delete of an old entry left in the log by an earlier session
+        data_manager = self.load(False)
+        old_id = data_manager.data[10].id
+        data_manager.delete_entry_by_id(old_id)
+        data_manager.close()
+
+        data_manager = self.load(True)
+        self.assertTrue(data_manager.history_pending)
+        self.assertEqual(len(data_manager.data), self.RECENT)
+        with self.assertRaises(ValueError):
+            data_manager.check_history_loaded()
+
+        # Before the worker takes its snapshot
+        early_deleted = data_manager.data[0].id
+        data_manager.delete_entry_by_id(early_deleted)
+        data_manager.add_entry(Entry("2100-01-01", "Happy", "added before load_history"))
+
+        merged = data_manager.load_history()
+        self.assertIsNotNone(merged)
+
+        # Between the worker build and the swap on the Tk thread
+        late_deleted = data_manager.data[5].id
+        data_manager.delete_entry_by_id(late_deleted)
+        data_manager.add_entry(Entry("2100-01-02", "Calm", "added before merge_history"))
+        self.assertTrue(data_manager.merge_history(merged))
+
+        self.assertFalse(data_manager.history_pending)
+        data_manager.check_history_loaded()
+        self.assertEqual(len(data_manager.data), self.COUNT - 3 + 2)
+        ids = [entry.id for entry in data_manager.data]
+        self.assertEqual(len(ids), len(set(ids)))
+        for entry_id in (old_id, early_deleted, late_deleted):
+            self.assertNotIn(entry_id, ids)
+            self.assertIsNone(data_manager.get_entry(entry_id))
+        self.assertEqual([entry.notes for entry in data_manager.data[-2:]],
+                         ["added before load_history", "added before merge_history"])
+
+        # Every index reflects the merged journal
+        self.assertEqual(sum(data_manager.aggregates.mood_counts.values()), len(ids))
+        self.assertEqual([entry.id for entry in data_manager.get_entries({'start_date': '2100-01-01'})], ids[-2:])
+        self.assertEqual(len(data_manager.search_entries("added before merge_history")), 1)
+        entries = data_manager.get_entries({'mood': 'Happy'})
+        self.assertEqual(entries, [entry for entry in data_manager.data if entry.mood == 'Happy'])
+        data_manager.close()
+
+        # What was written matches what a full load reads back
+        reloaded = self.load(False)
+        self.assertEqual([entry.id for entry in reloaded.data], ids)
+        reloaded.close()
+
+    def test_replacing_journal_drops_pending_history(self):
+        data_manager = self.load(True)
+        merged = data_manager.load_history()
+        data_manager.replace_entries([{"date": "2024-01-01", "mood": "Happy", "notes": "only"}])
+        self.assertFalse(data_manager.merge_history(merged))
+        self.assertEqual([entry.notes for entry in data_manager.data], ["only"])
+        data_manager.close()
+
+if __name__ == "__main__":
+    unittest.main()
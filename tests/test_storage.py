@@ -0,0 +1,57 @@
+"""
+Regression tests for journal storage crash safety
+"""
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+from Configuration.settings import AppConfig
+from modules.data_manager import DataManager
+from modules.entry import Entry
+from modules.storage import JsonFileStorage
+
+class LogReplayCrashTest(unittest.TestCase):
+    """A crash after the snapshot rename but before the log is dropped"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.filename = os.path.join(self.directory, "journal.json")
+        self.progressive = AppConfig.LOAD_PROGRESSIVE
+        AppConfig.LOAD_PROGRESSIVE = False
+
+    def tearDown(self):
+        AppConfig.LOAD_PROGRESSIVE = self.progressive
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_stale_log_is_not_replayed_twice(self):
+        data_manager = DataManager(self.filename, append_only=True)
+        data_manager.add_entry(Entry("2024-01-01", "Happy", "first"))
+        data_manager.add_entry(Entry("2024-01-02", "Sad", "second"))
+        data_manager.delete_entry(0)
+        data_manager.flush_data()
+        # Simulate dying between os.replace of the snapshot and removing the log
+        with mock.patch.object(JsonFileStorage, 'drop_log'):
+            data_manager.compact_data()
+        data_manager.storage.log_file.close()
+        self.assertTrue(os.path.exists(data_manager.storage.log_filename))
+
+        reloaded = DataManager(self.filename)
+        ids = [entry.id for entry in reloaded.data]
+        self.assertEqual([entry.notes for entry in reloaded.data], ["second"])
+        self.assertEqual(len(ids), len(set(ids)))
+        reloaded.close()
+
+    def test_replay_is_idempotent(self):
+        storage = JsonFileStorage(self.filename, append_only=True)
+        storage.initialize()
+        data = []
+        entry = Entry("2024-01-01", "Calm", "note", id="a")
+        storage.append_records([{"op": "add", "entry": entry}], data)
+        storage.close()
+        data = [entry]
+        JsonFileStorage.replay_log(storage.log_filename, data)
+        self.assertEqual(len(data), 1)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+"""
+Tests for the full-text index over entry notes
+"""
+import random
+import unittest
+from modules.entry import Entry
+from modules.text_index import NoteTextIndex
+
+WORDS = "rain run running runner walk walked work worked tea team coffee".split()
+
+class NoteTextIndexTest(unittest.TestCase):
+    """Indexed searches must agree with a scan of the notes after every edit"""
+
+    QUERIES = ["run", "run*", "walk*", "te*", "work* tea", "rain run*", "x*", "", "coffee walked"]
+
+    def scan(self, entries, query):
+        return {entry.id for entry in entries if NoteTextIndex.matches(entry.notes, query)}
+
+    def assert_in_sync(self, text_index, entries):
+        for query in self.QUERIES:
+            self.assertEqual(text_index.search(query, entries), self.scan(entries, query), query)
+        self.assertEqual(text_index.terms, sorted(text_index.postings))
+
+    def test_prefix_and_term_search_after_edits(self):
+        rng = random.Random(3)
+        entries = []
+        text_index = NoteTextIndex()
+        for number in range(300):
+            if entries and rng.random() < 0.4:
+                entry = entries.pop(rng.randrange(len(entries)))
+                text_index.remove(entry)
+            else:
+                notes = " ".join(rng.choices(WORDS, k=rng.randint(0, 4))).capitalize()
+                entry = Entry("2024-01-01", "Happy", notes, id=str(number))
+                entries.append(entry)
+                text_index.add(entry)
+            if number % 25 == 0:
+                self.assert_in_sync(text_index, entries)
+        self.assert_in_sync(text_index, entries)
+
+    def test_removed_term_leaves_prefix_results(self):
+        text_index = NoteTextIndex()
+        runner = Entry("2024-01-01", "Happy", "Runner", id="a")
+        run = Entry("2024-01-02", "Happy", "run run", id="b")
+        entries = [runner, run]
+        self.assertEqual(text_index.search("run*", entries), {"a", "b"})
+
+        text_index.remove(runner)
+        self.assertEqual(text_index.search("run*", entries), {"b"})
+        self.assertNotIn("runner", text_index.terms)
+
+        text_index.add(Entry("2024-01-03", "Sad", "running late", id="c"))
+        self.assertEqual(text_index.search("run*", entries), {"b", "c"})
+        self.assertEqual(text_index.search("running", entries), {"c"})
+
+    def test_edits_before_first_search_are_picked_up_by_rebuild(self):
+        text_index = NoteTextIndex()
+        entries = [Entry("2024-01-01", "Happy", "tea", id="a")]
+        # Not built yet: add and remove are no-ops until the first search
+        text_index.add(entries[0])
+        self.assertFalse(text_index.built)
+        self.assertEqual(text_index.search("tea", entries), {"a"})
+
+        text_index.invalidate()
+        entries.append(Entry("2024-01-02", "Happy", "team tea", id="b"))
+        self.assertEqual(text_index.search("tea*", entries), {"a", "b"})
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,48 @@
+"""
+Streaming CSV export of journal entries
+"""
+import csv
+import gzip
+import io
+from Configuration.settings import AppConfig
+
+class CSVExporter:
+    """Writes entries to CSV one row at a time through a large write buffer"""
+
+    FIELDS = ("Date", "Mood", "Notes")
+
+    def __init__(self, buffer_size=None):
+        self.buffer_size = buffer_size or AppConfig.EXPORT_BUFFER_SIZE
+
+    @staticmethod
+    def is_compressed(filename):
+        """Whether an export to filename should be gzipped: only names ending in .gz are"""
+        return filename.endswith('.gz')
+
+    def open_output(self, filename):
+        """Open a buffered text stream for the export, gzipped if requested"""
+        if self.is_compressed(filename):
+            raw = gzip.GzipFile(filename, 'wb', compresslevel=AppConfig.EXPORT_COMPRESS_LEVEL)
+        else:
+            raw = io.FileIO(filename, 'w')
+        buffered = io.BufferedWriter(raw, buffer_size=self.buffer_size)
+        # newline='' lets the csv module write its own \r\n line endings
+        return io.TextIOWrapper(buffered, encoding='utf-8', newline='')
+
+    def export(self, entries, filename, progress=None):
+        """Write an iterable of entries to filename, returning the number of rows
+
+        entries is consumed lazily, so memory use doesn't grow with the journal.
+        progress(rows) is called every AppConfig.TASK_PROGRESS_EVERY rows and may
+        raise to abort the export.
+        """
+        rows = 0
+        with self.open_output(filename) as file:
+            writer = csv.writer(file, quoting=csv.QUOTE_ALL)
+            writer.writerow(self.FIELDS)
+            for entry in entries:
+                writer.writerow((entry['date'], entry['mood'], entry.get('notes', '')))
+                rows += 1
+                if progress and rows % AppConfig.TASK_PROGRESS_EVERY == 0:
+                    progress(rows)
+        return rows
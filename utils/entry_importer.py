@@ -0,0 +1,67 @@
+"""
+Streaming readers for bulk importing entries from CSV or JSON Lines files
+"""
+import csv
+import gzip
+import json
+
+class EntryImporter:
+    """Yields (line number, entry) pairs from an import file one row at a time
+
+    Rows that can't be parsed are yielded with entry set to None so the caller
+    can report them alongside validation failures.
+    """
+
+    @staticmethod
+    def open_text(filename):
+        """Open an import file as text, transparently decompressing .gz files"""
+        if filename.endswith('.gz'):
+            return gzip.open(filename, 'rt', encoding='utf-8', newline='')
+        return open(filename, 'r', encoding='utf-8', newline='')
+
+    @classmethod
+    def read(cls, filename):
+        """Read entries from a CSV or JSON Lines file, picked by extension"""
+        name = filename[:-3] if filename.endswith('.gz') else filename
+        if name.endswith('.csv'):
+            return cls.read_csv(filename)
+        return cls.read_jsonl(filename)
+
+    @classmethod
+    def read_csv(cls, filename):
+        """Read a CSV file with Date, Mood and Notes columns (as written by Export CSV)"""
+        with cls.open_text(filename) as file:
+            reader = csv.reader(file)
+            header = next(reader, None)
+            if header is None:
+                return
+            columns = {name.strip().lower(): i for i, name in enumerate(header)}
+            if 'date' not in columns or 'mood' not in columns:
+                raise ValueError("CSV file needs Date and Mood columns")
+            notes_column = columns.get('notes')
+
+            for row in reader:
+                try:
+                    entry = {
+                        "date": row[columns['date']].strip(),
+                        "mood": row[columns['mood']].strip(),
+                        "notes": row[notes_column] if notes_column is not None else "",
+                    }
+                except IndexError:
+                    entry = None
+                yield reader.line_num, entry
+
+    @classmethod
+    def read_jsonl(cls, filename):
+        """Read a JSON Lines file with one entry object per line"""
+        with cls.open_text(filename) as file:
+            for line_number, line in enumerate(file, 1):
+                if not line.strip():
+                    continue
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    entry = None
+                if not isinstance(entry, dict):
+                    entry = None
+                yield line_number, entry
@@ -0,0 +1,169 @@
+"""
+Opt-in timing, allocation and profiling hooks for hot-path operations
+"""
+import cProfile
+import functools
+import io
+import json
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+from collections import deque
+from datetime import datetime
+from Configuration.settings import AppConfig
+
+class Instrumentation:
+    """Keeps a ring buffer of recent operation timings
+
+    Operations wrapped with @instrumented are recorded only while enabled;
+    when disabled the wrapper costs a single attribute check. Allocation
+    counts come from tracemalloc, which is process-wide: an operation that
+    overlaps another (nested, or on the background worker) shares its peak.
+    """
+
+    def __init__(self, enabled=None, trace_memory=None, buffer_size=None):
+        self.lock = threading.Lock()
+        self.records = deque(maxlen=buffer_size or AppConfig.INSTRUMENTATION_BUFFER_SIZE)
+        self.enabled = False
+        self.trace_memory = False
+        self.started_tracing = False
+        # One-shot cProfile capture: armed by profile_next, taken by the next operation
+        self.profile_armed = False
+        self.profiling = False
+        self.last_profile = None
+        self.set_enabled(AppConfig.INSTRUMENTATION_ENABLED if enabled is None else enabled,
+                         AppConfig.INSTRUMENTATION_TRACE_MEMORY if trace_memory is None else trace_memory)
+
+    def set_enabled(self, enabled, trace_memory=None):
+        """Turn recording (and optionally allocation tracing) on or off"""
+        if trace_memory is None:
+            trace_memory = self.trace_memory
+        trace_memory = enabled and trace_memory
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self.started_tracing = True
+        elif not trace_memory and self.started_tracing:
+            # Leave tracing alone if something else started it
+            tracemalloc.stop()
+            self.started_tracing = False
+        self.trace_memory = trace_memory
+        self.enabled = enabled
+
+    def profile_next(self):
+        """Run the next instrumented operation under cProfile, even while recording is off"""
+        self.profile_armed = True
+
+    def call(self, name, func, args, kwargs):
+        """Run func, recording its duration and allocations"""
+        profiler = None
+        with self.lock:
+            if self.profile_armed and not self.profiling:
+                self.profile_armed = False
+                self.profiling = True
+                profiler = cProfile.Profile()
+
+        tracing = self.trace_memory and tracemalloc.is_tracing()
+        if tracing:
+            memory_before = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+        start = time.perf_counter()
+        error = None
+        try:
+            if profiler is not None:
+                return profiler.runcall(func, *args, **kwargs)
+            return func(*args, **kwargs)
+        except Exception as e:
+            error = type(e).__name__
+            raise
+        finally:
+            duration_ms = (time.perf_counter() - start) * 1000
+            record = {
+                'operation': name,
+                'timestamp': datetime.now().isoformat(timespec='milliseconds'),
+                'duration_ms': round(duration_ms, 3),
+                'thread': threading.current_thread().name,
+            }
+            if tracing:
+                memory_after, peak = tracemalloc.get_traced_memory()
+                record['allocated_kb'] = round((memory_after - memory_before) / 1024, 1)
+                record['peak_kb'] = round((peak - memory_before) / 1024, 1)
+            if error:
+                record['error'] = error
+            if profiler is not None:
+                record['profile'] = self.save_profile(name, profiler)
+            with self.lock:
+                self.records.append(record)
+
+    def save_profile(self, name, profiler):
+        """Write a captured profile to PROFILE_OUTPUT_DIR and keep its text summary"""
+        stream = io.StringIO()
+        pstats.Stats(profiler, stream=stream).sort_stats('cumulative').print_stats(AppConfig.PROFILE_TOP_FUNCTIONS)
+        filename = None
+        try:
+            os.makedirs(AppConfig.PROFILE_OUTPUT_DIR, exist_ok=True)
+            stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            filename = os.path.join(AppConfig.PROFILE_OUTPUT_DIR, f"{name}_{stamp}.prof")
+            profiler.dump_stats(filename)
+        except OSError as e:
+            print(f"Could not write profile: {e}")
+            filename = None
+        with self.lock:
+            self.last_profile = {'operation': name, 'filename': filename, 'summary': stream.getvalue()}
+            self.profiling = False
+        return filename
+
+    def get_records(self):
+        """Copy of the buffered records, oldest first"""
+        with self.lock:
+            return list(self.records)
+
+    def summarize(self, records=None):
+        """Per-operation count, total, mean and max duration of records (default: the buffer)"""
+        if records is None:
+            records = self.get_records()
+        summary = {}
+        for record in records:
+            stats = summary.setdefault(record['operation'], {'count': 0, 'total_ms': 0.0, 'max_ms': 0.0})
+            stats['count'] += 1
+            stats['total_ms'] += record['duration_ms']
+            stats['max_ms'] = max(stats['max_ms'], record['duration_ms'])
+        for stats in summary.values():
+            stats['mean_ms'] = round(stats['total_ms'] / stats['count'], 3)
+            stats['total_ms'] = round(stats['total_ms'], 3)
+        return summary
+
+    def clear(self):
+        """Drop every buffered record"""
+        with self.lock:
+            self.records.clear()
+
+    def dump(self, filename=None):
+        """Write the buffer, its summary and the last profile to a JSON file"""
+        filename = filename or AppConfig.INSTRUMENTATION_DUMP_FILENAME
+        records = self.get_records()
+        report = {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'trace_memory': self.trace_memory,
+            'summary': self.summarize(records),
+            'records': records,
+            'last_profile': self.last_profile,
+        }
+        with open(filename, 'w') as file:
+            json.dump(report, file, indent=4)
+        return filename
+
+# Shared by every instrumented operation and the Settings tab
+instrumentation = Instrumentation()
+
+def instrumented(func):
+    """Record calls to func in the shared instrumentation buffer while it is enabled"""
+    name = func.__qualname__
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if not (instrumentation.enabled or instrumentation.profile_armed):
+            return func(*args, **kwargs)
+        return instrumentation.call(name, func, args, kwargs)
+    return wrapper
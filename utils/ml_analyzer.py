@@ -1,29 +1,169 @@
 """
 ML Analyzer for sentiment analysis and insights
 """
-from textblob import TextBlob
+import os
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from importlib import metadata
 from Configuration.settings import AppConfig
+from utils.instrumentation import instrumented
+from utils.sentiment_cache import SentimentCache
+
+def score_notes_chunk(chunk):
+    """Score a chunk of (index, notes) pairs; runs inside a worker process
+    
+    Failed notes come back as (index, None, None) so the parent knows not to cache them.
+    """
+    analyzer = MLAnalyzer(use_cache=False)
+    results = []
+    for index, notes in chunk:
+        try:
+            results.append((index, *analyzer.compute_sentiment(notes)))
+        except Exception as e:
+            print(f"Sentiment analysis error: {e}")
+            results.append((index, None, None))
+    return results
 
 class MLAnalyzer:
     """Handles ML-based analysis for mood entries"""
     
-    def __init__(self):
-        pass
+    # Part of every cache key, so bump the suffix when the scoring logic changes
+    SCORING_REVISION = 1
+    
+    def __init__(self, use_cache=True):
+        self.cache = None
+        if use_cache and AppConfig.SENTIMENT_CACHE_ENABLED:
+            self.cache = SentimentCache(AppConfig.SENTIMENT_CACHE_FILENAME, self.get_version())
+    
+    def close(self):
+        """Commit cached scores and close the cache"""
+        if self.cache:
+            self.cache.close()
+            self.cache = None
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    @classmethod
+    def get_version(cls):
+        """Analyzer version string, read from package metadata so TextBlob isn't imported"""
+        try:
+            textblob_version = metadata.version('textblob')
+        except metadata.PackageNotFoundError:
+            textblob_version = 'unknown'
+        return f"textblob-{textblob_version}-{cls.SCORING_REVISION}"
+    
+    def compute_sentiment(self, notes):
+        """Run TextBlob on notes, bypassing the cache"""
+        # Imported here so TextBlob and its corpora load only when a note is actually scored
+        from textblob import TextBlob
+        blob = TextBlob(notes)
+        polarity = blob.sentiment.polarity  # -1.0 to +1.0
+        subjectivity = blob.sentiment.subjectivity  # 0.0 to 1.0
+        return polarity, subjectivity
     
+    @instrumented
     def analyze_sentiment(self, notes):
         """Analyze sentiment of notes text using TextBlob"""
         try:
             if not notes.strip():
                 return AppConfig.NEUTRAL_SENTIMENT, 0.0  # Neutral if no notes
             
-            blob = TextBlob(notes)
-            polarity = blob.sentiment.polarity  # -1.0 to +1.0
-            subjectivity = blob.sentiment.subjectivity  # 0.0 to 1.0
-            return polarity, subjectivity
+            if self.cache:
+                cached = self.cache.get(notes)
+                if cached is not None:
+                    return cached
+            
+            scores = self.compute_sentiment(notes)
+            if self.cache:
+                self.cache.put(notes, scores)
+            return scores
         except Exception as e:
             print(f"Sentiment analysis error: {e}")
             return AppConfig.NEUTRAL_SENTIMENT, 0.0
     
+    def analyze_sentiment_batch(self, notes_iterable, workers=None, chunk_size=None):
+        """Score many notes across a process pool, yielding (index, polarity, subjectivity)
+        
+        Results are yielded as each chunk finishes, so they may arrive out of order.
+        Only a few chunks per worker are in flight at once, keeping memory bounded
+        for arbitrarily long inputs. Cached and empty notes never reach the pool.
+        """
+        workers = workers or AppConfig.SENTIMENT_WORKERS or os.cpu_count() or 1
+        chunk_size = chunk_size or AppConfig.SENTIMENT_CHUNK_SIZE
+        try:
+            if workers == 1:
+                # Skip process start-up and pickling entirely
+                for index, notes in enumerate(notes_iterable):
+                    yield (index, *self.analyze_sentiment(notes))
+            else:
+                yield from self.score_in_pool(notes_iterable, workers, chunk_size)
+        finally:
+            # Also reached when the caller stops iterating early
+            if self.cache:
+                self.cache.flush()
+    
+    def score_in_pool(self, notes_iterable, workers, chunk_size):
+        """Process pool half of analyze_sentiment_batch
+        
+        Cached and empty notes are yielded as soon as they are read; only the
+        chunk being filled and the chunks in flight are held in memory.
+        """
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            max_in_flight = workers * 2
+            pending = {}
+            chunk = []
+            for index, notes in enumerate(notes_iterable):
+                if not notes.strip():
+                    yield index, AppConfig.NEUTRAL_SENTIMENT, 0.0
+                    continue
+                
+                cached = self.cache.get(notes) if self.cache else None
+                if cached is not None:
+                    yield (index, *cached)
+                    continue
+                
+                chunk.append((index, notes))
+                if len(chunk) >= chunk_size:
+                    pending[executor.submit(score_notes_chunk, chunk)] = chunk
+                    chunk = []
+                    # Stop reading input until a chunk comes back
+                    while len(pending) >= max_in_flight:
+                        yield from self.collect_scored(pending)
+            
+            if chunk:
+                pending[executor.submit(score_notes_chunk, chunk)] = chunk
+            while pending:
+                yield from self.collect_scored(pending)
+    
+    def collect_scored(self, pending):
+        """Wait for at least one in-flight chunk, caching and yielding its results"""
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            notes_by_index = dict(pending.pop(future))
+            for index, polarity, subjectivity in future.result():
+                if polarity is None:
+                    yield index, AppConfig.NEUTRAL_SENTIMENT, 0.0
+                    continue
+                if self.cache:
+                    self.cache.put(notes_by_index[index], (polarity, subjectivity))
+                yield index, polarity, subjectivity
+    
+    def get_cache_stats(self):
+        """Get sentiment cache hit/miss counters, or None when caching is off"""
+        return self.cache.get_stats() if self.cache else None
+    
+    def score_entries(self, entries, workers=None, chunk_size=None):
+        """Write sentiment_score into each entry as batch results arrive"""
+        scored = 0
+        notes = (entry.get('notes', '') for entry in entries)
+        for index, polarity, _ in self.analyze_sentiment_batch(notes, workers, chunk_size):
+            entries[index]['sentiment_score'] = polarity
+            scored += 1
+        return scored
+    
     def get_overall_sentiment_trend(self, entries):
         """Get average sentiment from recent entries (last 7)"""
         if not entries:
@@ -1,101 +1,247 @@
 """
 Report generation utilities
 """
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-import tkinter as tk
-from datetime import datetime
 from Configuration.settings import AppConfig
+from utils.instrumentation import instrumented
+
+def load_chart_backend():
+    """Import Figure and the Tk canvas on first use, keeping matplotlib out of startup"""
+    # Figures are created directly rather than through pyplot, so pyplot's global
+    # figure registry never holds on to them
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+    return Figure, FigureCanvasTkAgg
 
 class ReportGenerator:
     """Handles generation of various reports"""
     
     def __init__(self, data_manager):
         self.data_manager = data_manager
+        # One persistent figure and canvas per chart report type
+        self.charts = {}
+        # Offscreen Agg figures reused by render_chart
+        self.headless_charts = {}
+    
+    def get_chart(self, report_type, parent_frame, figsize):
+        """Get the chart for a report type, creating its figure and canvas on first use"""
+        chart = self.charts.get(report_type)
+        if chart is not None and chart['parent'] is not parent_frame:
+            self.close_chart(report_type)
+            chart = None
+        
+        if chart is None:
+            Figure, FigureCanvasTkAgg = load_chart_backend()
+            figure = Figure(figsize=figsize)
+            canvas = FigureCanvasTkAgg(figure, parent_frame)
+            chart = {
+                'parent': parent_frame,
+                'figure': figure,
+                'axes': figure.add_subplot(),
+                'canvas': canvas,
+                'widget': canvas.get_tk_widget(),
+                'artists': None,
+            }
+            self.charts[report_type] = chart
+        return chart
+    
+    def show_chart(self, chart):
+        """Redraw a chart after its artists changed and make it visible"""
+        chart['figure'].tight_layout()
+        chart['canvas'].draw_idle()
+        chart['widget'].pack(fill='both', expand=True)
+        return chart['canvas']
+    
+    def clear_report_frame(self, parent_frame):
+        """Hide persistent chart canvases and destroy any other report widgets"""
+        chart_widgets = [chart['widget'] for chart in self.charts.values()]
+        for widget in parent_frame.winfo_children():
+            if any(widget is chart_widget for chart_widget in chart_widgets):
+                widget.pack_forget()
+            else:
+                widget.destroy()
+    
+    def close_chart(self, report_type):
+        """Destroy a chart's canvas widget and release its figure"""
+        chart = self.charts.pop(report_type, None)
+        if chart is None:
+            return
+        chart['widget'].destroy()
+        chart['figure'].clear()
+    
+    def close_charts(self):
+        """Tear down every chart (call before the window is destroyed)"""
+        for report_type in list(self.charts):
+            self.close_chart(report_type)
+        for chart in self.headless_charts.values():
+            chart['figure'].clear()
+        self.headless_charts = {}
     
-    def generate_summary_report(self, parent_frame):
+    def get_mood_counts(self):
+        """Count entries per mood (safe to run off the Tk thread)"""
+        # DataManager keeps these counts up to date on every add and delete
+        with self.data_manager.lock:
+            return dict(self.data_manager.aggregates.mood_counts)
+    
+    @instrumented
+    def generate_summary_report(self, parent_frame, mood_counts=None):
         """Generate mood frequency bar chart"""
-        mood_counts = {}
-        for entry in self.data_manager.data:
-            mood = entry["mood"]
-            mood_counts[mood] = mood_counts.get(mood, 0) + 1
+        if mood_counts is None:
+            mood_counts = self.get_mood_counts()
+        self.clear_report_frame(parent_frame)
+        chart = self.get_chart("summary", parent_frame, AppConfig.CHART_FIGSIZE)
+        self.draw_summary_chart(chart, mood_counts)
+        return self.show_chart(chart)
+    
+    def draw_summary_chart(self, chart, mood_counts):
+        """Draw or update the mood frequency bars on a chart's axes"""
+        ax = chart['axes']
         
-        fig, ax = plt.subplots(figsize=AppConfig.CHART_FIGSIZE)
         moods = list(mood_counts.keys())
         counts = list(mood_counts.values())
         
-        bars = ax.bar(moods, counts, color='skyblue')
-        ax.set_xlabel("Mood")
-        ax.set_ylabel("Frequency")
-        ax.set_title("Mood Frequency Report")
+        artists = chart['artists']
+        if artists is not None and artists['moods'] == moods:
+            # Same categories as last time: just move the bars and their labels
+            for bar, label, count in zip(artists['bars'], artists['labels'], counts):
+                bar.set_height(count)
+                label.set_y(count + 0.1)
+                label.set_text(str(count))
+            ax.relim()
+            ax.autoscale_view()
+        else:
+            ax.clear()
+            bars = ax.bar(moods, counts, color='skyblue')
+            ax.set_xlabel("Mood")
+            ax.set_ylabel("Frequency")
+            ax.set_title("Mood Frequency Report")
+            
+            # Add value labels on bars
+            labels = [
+                ax.text(bar.get_x() + bar.get_width()/2, bar.get_height() + 0.1,
+                        str(count), ha='center', va='bottom')
+                for bar, count in zip(bars, counts)
+            ]
+            ax.tick_params(axis='x', labelrotation=45)
+            chart['artists'] = {'moods': moods, 'bars': list(bars), 'labels': labels}
+    
+    def get_timeline_data(self):
+        """Get (dates, mood_values, unique_moods) for the timeline, or None if there is no data"""
+        # Entries may be added or deleted on another thread while this runs
+        with self.data_manager.lock:
+            if not self.data_manager.data:
+                return None
+            
+            columns = self.data_manager.columns
+            if columns is not None:
+                # Vectorized argsort and mood re-coding over the column store
+                order, mood_values, unique_moods = columns.timeline()
+                dates = [self.data_manager.data[row].date for row in order.tolist()]
+                return dates, mood_values.tolist(), unique_moods
         
-        # Add value labels on bars
-        for bar, count in zip(bars, counts):
-            ax.text(bar.get_x() + bar.get_width()/2, bar.get_height() + 0.1, 
-                   str(count), ha='center', va='bottom')
+            # Sort data by date
+            sorted_data = sorted(self.data_manager.data, key=lambda entry: entry.date)
         
-        plt.xticks(rotation=45)
-        plt.tight_layout()
+            dates = [entry.date for entry in sorted_data]
+            moods = [entry.mood for entry in sorted_data]
         
-        # Embed in Tkinter
-        canvas = FigureCanvasTkAgg(fig, parent_frame)
-        canvas.draw()
-        canvas.get_tk_widget().pack(fill='both', expand=True)
-        return canvas
+            # Convert moods to numerical values for plotting
+            unique_moods = list(set(moods))
+            mood_map = {mood: i for i, mood in enumerate(unique_moods)}
+            mood_values = [mood_map[mood] for mood in moods]
+            return dates, mood_values, unique_moods
+    
     
-    def generate_timeline_report(self, parent_frame):
+    @instrumented
+    def generate_timeline_report(self, parent_frame, timeline_data=None):
         """Generate mood timeline chart"""
-        if not self.data_manager.data:
+        if timeline_data is None:
+            timeline_data = self.get_timeline_data()
+        if timeline_data is None:
             return None
-            
-        # Sort data by date
-        sorted_data = sorted(self.data_manager.data, key=lambda x: x['date'])
+        self.clear_report_frame(parent_frame)
+        chart = self.get_chart("timeline", parent_frame, AppConfig.TIMELINE_FIGSIZE)
+        self.draw_timeline_chart(chart, timeline_data)
+        return self.show_chart(chart)
+    
+    def draw_timeline_chart(self, chart, timeline_data):
+        """Draw or update the mood timeline line on a chart's axes"""
+        dates, mood_values, unique_moods = timeline_data
+        ax = chart['axes']
         
-        dates = [entry['date'] for entry in sorted_data]
-        moods = [entry['mood'] for entry in sorted_data]
+        # Plot against date positions so the line can be updated in place; the
+        # tick labels reproduce the evenly spaced date categories
+        date_labels = list(dict.fromkeys(dates))
+        date_positions = {date: i for i, date in enumerate(date_labels)}
+        x_values = [date_positions[date] for date in dates]
         
-        # Convert moods to numerical values for plotting
-        unique_moods = list(set(moods))
-        mood_map = {mood: i for i, mood in enumerate(unique_moods)}
-        mood_values = [mood_map[mood] for mood in moods]
+        if chart['artists'] is None:
+            line, = ax.plot(x_values, mood_values, marker='o', linestyle='-', color='purple')
+            ax.set_xlabel("Date")
+            ax.set_ylabel("Mood")
+            ax.set_title("Mood Timeline Report")
+            chart['artists'] = {'line': line}
+        else:
+            chart['artists']['line'].set_data(x_values, mood_values)
         
-        fig, ax = plt.subplots(figsize=AppConfig.TIMELINE_FIGSIZE)
-        ax.plot(dates, mood_values, marker='o', linestyle='-', color='purple')
+        # Label at most TIMELINE_MAX_DATE_TICKS dates; drawing thousands of labels
+        # dominates render time and leaves them unreadable anyway
+        step = max(1, -(-len(date_labels) // AppConfig.TIMELINE_MAX_DATE_TICKS))
+        ticks = range(0, len(date_labels), step)
+        ax.set_xticks(ticks)
+        ax.set_xticklabels([date_labels[i] for i in ticks], rotation=45)
         ax.set_yticks(range(len(unique_moods)))
         ax.set_yticklabels(unique_moods)
-        ax.set_xlabel("Date")
-        ax.set_ylabel("Mood")
-        ax.set_title("Mood Timeline Report")
-        plt.xticks(rotation=45)
-        plt.tight_layout()
+        ax.relim()
+        ax.autoscale_view()
+    
+    def render_chart(self, report_type, filename=None, report_data=None):
+        """Render a chart report headlessly with the Agg backend
+        
+        Writes an image to filename when given (format from its extension) and
+        returns False if there was nothing to plot. Needs no display or Tk.
+        """
+        if report_type == "summary":
+            report_data = self.get_mood_counts() if report_data is None else report_data
+            figsize, draw = AppConfig.CHART_FIGSIZE, self.draw_summary_chart
+        elif report_type == "timeline":
+            report_data = self.get_timeline_data() if report_data is None else report_data
+            figsize, draw = AppConfig.TIMELINE_FIGSIZE, self.draw_timeline_chart
+        else:
+            raise ValueError(f"Unknown chart report: {report_type}")
+        if not report_data:
+            return False
         
-        canvas = FigureCanvasTkAgg(fig, parent_frame)
-        canvas.draw()
-        canvas.get_tk_widget().pack(fill='both', expand=True)
-        return canvas
+        chart = self.headless_charts.get(report_type)
+        if chart is None:
+            from matplotlib.figure import Figure
+            from matplotlib.backends.backend_agg import FigureCanvasAgg
+            figure = Figure(figsize=figsize)
+            chart = {
+                'figure': figure,
+                'axes': figure.add_subplot(),
+                'canvas': FigureCanvasAgg(figure),
+                'artists': None,
+            }
+            # Kept so batch runs over many journals only update the artists
+            self.headless_charts[report_type] = chart
+        draw(chart, report_data)
+        chart['figure'].tight_layout()
+        if filename:
+            chart['figure'].savefig(filename)
+        else:
+            chart['canvas'].draw()
+        return True
     
+    @instrumented
     def generate_weekly_report_text(self):
         """Generate weekly summary report text"""
         report_text = "Weekly Summary Report\n\n"
         
-        if not self.data_manager.data:
-            return report_text + "No data available."
-        
-        # Group by week and count moods
-        weekly_data = {}
-        for entry in self.data_manager.data:
-            try:
-                date = datetime.strptime(entry['date'], AppConfig.DATE_FORMAT)
-                year, week, _ = date.isocalendar()
-                week_key = f"{year}-W{week:02d}"
-                
-                if week_key not in weekly_data:
-                    weekly_data[week_key] = {}
-                
-                mood = entry['mood']
-                weekly_data[week_key][mood] = weekly_data[week_key].get(mood, 0) + 1
-            except ValueError:
-                continue
+        with self.data_manager.lock:
+            if not self.data_manager.data:
+                return report_text + "No data available."
+            # Per-week mood counts are maintained incrementally by DataManager
+            weekly_data = self.get_report_data("weekly")
         
         for week, moods in sorted(weekly_data.items()):
             report_text += f"Week {week}:\n"
@@ -105,27 +251,16 @@ class ReportGenerator:
         
         return report_text
     
+    @instrumented
     def generate_monthly_report_text(self):
         """Generate monthly summary report text"""
         report_text = "Monthly Summary Report\n\n"
         
-        if not self.data_manager.data:
-            return report_text + "No data available."
-        
-        # Group by month and count moods
-        monthly_data = {}
-        for entry in self.data_manager.data:
-            try:
-                date = datetime.strptime(entry['date'], AppConfig.DATE_FORMAT)
-                month_key = date.strftime("%Y-%m")
-                
-                if month_key not in monthly_data:
-                    monthly_data[month_key] = {}
-                
-                mood = entry['mood']
-                monthly_data[month_key][mood] = monthly_data[month_key].get(mood, 0) + 1
-            except ValueError:
-                continue
+        with self.data_manager.lock:
+            if not self.data_manager.data:
+                return report_text + "No data available."
+            # Per-month mood counts are maintained incrementally by DataManager
+            monthly_data = self.get_report_data("monthly")
         
         for month, moods in sorted(monthly_data.items()):
             report_text += f"Month {month}:\n"
@@ -135,11 +270,57 @@ class ReportGenerator:
         
         return report_text
     
+    @instrumented
+    def generate_summary_report_text(self):
+        """Generate mood frequency report text"""
+        report_text = "Mood Frequency Report\n\n"
+        
+        mood_counts = self.get_mood_counts()
+        if not mood_counts:
+            return report_text + "No data available."
+        
+        for mood, count in sorted(mood_counts.items(), key=lambda item: -item[1]):
+            report_text += f"{mood}: {count} entries\n"
+        return report_text
+    
+    @instrumented
+    def generate_timeline_report_text(self):
+        """Generate mood timeline report text, one line per entry in date order"""
+        timeline_data = self.get_timeline_data()
+        if timeline_data is None:
+            return "Mood Timeline Report\n\nNo data available."
+        
+        dates, mood_values, unique_moods = timeline_data
+        lines = [f"{date}: {unique_moods[value]}" for date, value in zip(dates, mood_values)]
+        return "Mood Timeline Report\n\n" + "\n".join(lines) + "\n"
+    
+    def get_report_data(self, report_type):
+        """Get a report's data as JSON-serializable structures"""
+        aggregates = self.data_manager.aggregates
+        if report_type == "weekly":
+            with self.data_manager.lock:
+                return {week: dict(moods) for week, moods in sorted(aggregates.weekly_counts.items())}
+        if report_type == "monthly":
+            with self.data_manager.lock:
+                return {month: dict(moods) for month, moods in sorted(aggregates.monthly_counts.items())}
+        if report_type == "summary":
+            return self.get_mood_counts()
+        if report_type == "timeline":
+            timeline_data = self.get_timeline_data()
+            if timeline_data is None:
+                return []
+            dates, mood_values, unique_moods = timeline_data
+            return [{'date': date, 'mood': unique_moods[value]} for date, value in zip(dates, mood_values)]
+        raise ValueError(f"Unknown report: {report_type}")
+    
+    @instrumented
     def generate_text_report(self, parent_frame, report_text):
         """Generate a text-based report in the given frame"""
-        # Clear previous content
-        for widget in parent_frame.winfo_children():
-            widget.destroy()
+        # Imported here so headless report generation works without Tk installed
+        import tkinter as tk
+        from tkinter import ttk
+        # Clear previous content, keeping chart canvases around for reuse
+        self.clear_report_frame(parent_frame)
         
         # Create text widget with scrollbar
         text_frame = ttk.Frame(parent_frame)
@@ -0,0 +1,127 @@
+"""
+Persistent cache for sentiment analysis results
+"""
+import hashlib
+import sqlite3
+import threading
+import time
+from Configuration.settings import AppConfig
+
+class SentimentCache:
+    """On-disk LRU cache of sentiment scores keyed by a hash of the note text"""
+
+    def __init__(self, filename, version, max_entries=None):
+        self.filename = filename
+        self.version = version
+        self.max_entries = max_entries or AppConfig.SENTIMENT_CACHE_MAX_ENTRIES
+        self.hits = 0
+        self.misses = 0
+        self.pending_writes = 0
+        self.last_commit = time.monotonic()
+        self.lock = threading.Lock()
+
+        self.connection = sqlite3.connect(filename, check_same_thread=False)
+        # Losing the tail of a cache on a crash is harmless, so skip the per-commit fsync
+        self.connection.execute("PRAGMA synchronous = OFF")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS sentiment ("
+            "key TEXT PRIMARY KEY, "
+            "polarity REAL NOT NULL, "
+            "subjectivity REAL NOT NULL, "
+            "last_used INTEGER NOT NULL)"
+        )
+        self.connection.execute("CREATE INDEX IF NOT EXISTS idx_sentiment_last_used ON sentiment (last_used)")
+        self.connection.commit()
+
+        self.size, self.clock = self.connection.execute(
+            "SELECT COUNT(*), COALESCE(MAX(last_used), 0) FROM sentiment"
+        ).fetchone()
+        # Rows including uncommitted writes; size only counts committed ones
+        self.stored = self.size
+
+    def make_key(self, notes):
+        """Hash the whitespace-normalized note text together with the analyzer version"""
+        normalized = " ".join(notes.split())
+        return hashlib.sha256(f"{self.version}\n{normalized}".encode('utf-8')).hexdigest()
+
+    def get(self, notes):
+        """Get cached (polarity, subjectivity) for notes, or None on a miss"""
+        key = self.make_key(notes)
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT polarity, subjectivity FROM sentiment WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            self.clock += 1
+            self.connection.execute("UPDATE sentiment SET last_used = ? WHERE key = ?", (self.clock, key))
+            self.note_write()
+            return row
+
+    def put(self, notes, scores):
+        """Store (polarity, subjectivity) for notes, evicting least recently used entries"""
+        key = self.make_key(notes)
+        with self.lock:
+            self.clock += 1
+            cursor = self.connection.execute(
+                "INSERT OR IGNORE INTO sentiment (key, polarity, subjectivity, last_used) VALUES (?, ?, ?, ?)",
+                (key, scores[0], scores[1], self.clock)
+            )
+            self.stored += cursor.rowcount
+
+            if self.stored > self.max_entries:
+                self.connection.execute(
+                    "DELETE FROM sentiment WHERE key IN "
+                    "(SELECT key FROM sentiment ORDER BY last_used LIMIT ?)",
+                    (self.stored - self.max_entries,)
+                )
+                self.stored = self.max_entries
+            self.note_write()
+
+    def note_write(self):
+        """Commit once enough writes have accumulated or the oldest has waited long enough"""
+        self.pending_writes += 1
+        if (self.pending_writes >= AppConfig.SENTIMENT_CACHE_COMMIT_EVERY
+                or time.monotonic() - self.last_commit >= AppConfig.SENTIMENT_CACHE_COMMIT_INTERVAL_S):
+            self.commit()
+
+    def commit(self):
+        """Commit pending writes (call with the lock held)"""
+        self.connection.commit()
+        self.pending_writes = 0
+        self.last_commit = time.monotonic()
+        self.size = self.stored
+
+    def flush(self):
+        """Commit any pending writes"""
+        with self.lock:
+            self.commit()
+
+    def clear(self):
+        """Remove every cached score and reset the counters"""
+        with self.lock:
+            self.connection.execute("DELETE FROM sentiment")
+            self.commit()
+            self.stored = 0
+            self.size = 0
+            self.hits = 0
+            self.misses = 0
+
+    def get_stats(self):
+        """Get hit/miss counters and the number of committed cache entries"""
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'size': self.size,
+            'max_entries': self.max_entries,
+        }
+
+    def close(self):
+        """Flush and close the cache database"""
+        self.flush()
+        self.connection.close()
@@ -0,0 +1,53 @@
+"""
+Startup timing report for tracking cold-start regressions
+"""
+import json
+import sys
+import time
+from datetime import datetime
+from Configuration.settings import AppConfig
+
+# Modules that must not be loaded before the first paint
+HEAVY_MODULES = ("matplotlib", "numpy", "textblob")
+
+class StartupTimer:
+    """Records named startup phases and checks them against the startup budget"""
+
+    def __init__(self, start_time=None):
+        self.start_time = start_time if start_time is not None else time.perf_counter()
+        self.phases = []
+
+    def mark(self, phase):
+        """Record the time elapsed since start for a named phase"""
+        elapsed_ms = (time.perf_counter() - self.start_time) * 1000
+        self.phases.append((phase, elapsed_ms))
+        return elapsed_ms
+
+    def build_report(self):
+        """Build the startup report as a dict"""
+        total_ms = self.phases[-1][1] if self.phases else 0.0
+        return {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'total_ms': round(total_ms, 1),
+            'budget_ms': AppConfig.STARTUP_BUDGET_MS,
+            'within_budget': total_ms <= AppConfig.STARTUP_BUDGET_MS,
+            'phases': [{'phase': phase, 'elapsed_ms': round(ms, 1)} for phase, ms in self.phases],
+            'heavy_modules_loaded': [name for name in HEAVY_MODULES if name in sys.modules],
+        }
+
+    def finish(self, phase="first paint"):
+        """Mark the final phase, write the report and warn if over budget"""
+        self.mark(phase)
+        report = self.build_report()
+
+        if AppConfig.STARTUP_REPORT_FILENAME:
+            try:
+                with open(AppConfig.STARTUP_REPORT_FILENAME, 'w') as file:
+                    json.dump(report, file, indent=4)
+            except OSError as e:
+                print(f"Could not write startup report: {e}")
+
+        if not report['within_budget'] or report['heavy_modules_loaded']:
+            print(f"Startup took {report['total_ms']} ms (budget {report['budget_ms']} ms); "
+                  f"heavy modules loaded: {report['heavy_modules_loaded'] or 'none'}")
+        return report